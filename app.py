@@ -1,128 +1,106 @@
 import os
-import time
 import random
-import cv2
+import time
 
 import pygame
-from pygame.image import load
-from pygame.transform import scale
 from pygame.mouse import get_pressed as mouse_press
 from pygame.mouse import get_pos as mouse_pos
-from pygame.font import SysFont
-
-pygame.init()
-pygame.font.init()
-
-WIN_SCALE = 1.4
-
-WIN_SIZE = WIDTH, HEIGHT = int(1000 * WIN_SCALE), int(600 * WIN_SCALE)
-TILE_SIZE = int(50 * WIN_SCALE)
-GRAVITY = 0.55
-DEBUG = True
-SCALE = 1.4
-# Dino
-DINO_WIDTH = 100 * SCALE
-DINO_HEIGHT = 0.8 * DINO_WIDTH
-DINO_DOWN_TIMER = 60
-
-COMMANDS = ['alive']
-
-# Obstcle
-CACTUS_WIDTH = 40 * SCALE
-CACTUS_HEIGHT = 1.5 * CACTUS_WIDTH
-
-CRATE_WIDTH = 50 * SCALE
-CRATE_HEIGHT = CRATE_WIDTH
-
-STONE_WIDTH = 40 * SCALE
-STONE_HEIGHT = 1.25 * STONE_WIDTH
-
-# Helicopter
 
-HELICOPTER_WIDTH = 150 * SCALE
-HELICOPTER_HEIGHT = HELICOPTER_WIDTH / 3
-
-
-class Tile:
-    def __init__(self, tilemap, image, x: int, y: int):
-        self.tilemap: TimeMap = tilemap
-        self.image = image
-        self.rect = self.image.get_rect(topleft=(x, y))
-        self.speed_force = 4
-
-    def draw(self):
-        self.tilemap.bg.scene.window.blit(self.image, self.rect)
-
-    def update(self):
-        self.rect.x -= self.tilemap.bg.speed  # * self.speed_force
-
-        if self.rect.x <= - TILE_SIZE:
-            self.rect.x = WIDTH + 2 * TILE_SIZE + self.rect.x  # % (self.tilemap.bg.speed * self.speed_force)
+from capture import screenshots
+from pool import EntityPool
+from probes import probes
+from render import DirtyRenderer
+from replay import InputLog
+from resources import assets, texts
+from settings import (
+    WIN_SCALE, WIN_SIZE, WIDTH, HEIGHT, TILE_SIZE, DEBUG, SCALE, TICK_RATE, TICK_TIME, FPS, MAX_FRAME_TIME,
+    DIRTY_RECTS, ASSET_BUNDLE, PIXEL_COLLISION, REPLAY_DIR, PROBES, PROBE_DIR, DINO_WIDTH, DINO_HEIGHT, COMMANDS,
+    CACTUS_WIDTH, CACTUS_HEIGHT, CRATE_WIDTH, CRATE_HEIGHT, CRATE_ANGLES, STONE_WIDTH, STONE_HEIGHT,
+)
+import simulation
+from simulation import GameState, DinoBody, ObstacleBody
 
 
 class TimeMap:
     def __init__(self, bg):
-        self.tileset = self.get_tileset()
         self.bg: Bg = bg
+        self.strip: pygame.Surface = self.get_strip()
+        self.rect = self.strip.get_rect(topleft=(0, HEIGHT - 2 * TILE_SIZE))
+        self.offset = 0
 
     def get_images(self) -> list:
         images = []
         for i in range(2, 6, 3):
-            image = load(f"assets/deserttileset/Tile/{i}.png").convert_alpha()
-            image = scale(image, (TILE_SIZE, TILE_SIZE))
-            images.append(image)
+            images.append(assets.image(f"assets/deserttileset/Tile/{i}.png", (TILE_SIZE, TILE_SIZE)))
         return images
 
-    def get_tileset(self):
-        tileset = []
+    def get_strip(self) -> pygame.Surface:
+        return assets.get(("ground_strip", TILE_SIZE, WIDTH), self.build_strip)
+
+    def build_strip(self) -> pygame.Surface:
+        # Every row repeats one tile, so a strip one tile wider than the window scrolls seamlessly
+        # by drawing it at -(offset % TILE_SIZE)
         images = self.get_images()
+        strip = pygame.Surface((WIDTH + TILE_SIZE, len(images) * TILE_SIZE), pygame.SRCALPHA).convert_alpha()
+        strip.fill((0, 0, 0, 0))
         for index, image in enumerate(images):
-            x = 0
-            y = HEIGHT - (2 - index) * TILE_SIZE
-            for i in range(WIDTH // TILE_SIZE + 2):
-                tileset.append(Tile(self, image, x, y))
-                x += TILE_SIZE
-        return tileset
+            for x in range(0, strip.get_width(), TILE_SIZE):
+                strip.blit(image, (x, index * TILE_SIZE))
+        return strip if assets.needs_alpha(strip) else strip.convert()
 
     def draw(self, screen: pygame.Surface = None):
+        x = self.bg.speed * self.bg.scene.lag - self.offset
+        self.bg.scene.window.blit(self.strip, (x - TILE_SIZE if x > 0 else x, self.rect.y))
 
-        for tile in self.tileset:
-            tile.draw()
-            if not self.bg.scene.is_pause:
-                tile.update()
+    def update(self):
+        self.offset = (self.offset + self.bg.speed) % TILE_SIZE
+
+    def reset(self):
+        self.offset = 0
 
 
 class Bg:
     def __init__(self, scene):
         self.scene: Scene = scene
         self.image = self.get_image()
-        self.rect = self.image.get_rect(topleft=(0, 0))
+        self.rect = pygame.Rect(0, 0, WIDTH, HEIGHT)
 
         self.tilemap = TimeMap(self)
         self.pause_btn: ImageButton = self.get_pause_btn()
-        self.speed = 4
+
+    @property
+    def speed(self) -> int:
+        return self.scene.state.bg_speed
 
     def get_image(self):
-        image = load("assets/deserttileset/BG.png").convert_alpha()
-        image = scale(image, WIN_SIZE)
-        return image
+        return assets.get(("bg_strip", WIN_SIZE), self.build_strip)
+
+    def build_strip(self) -> pygame.Surface:
+        # Flattened onto the white the window used to be filled with, and twice as wide as the window,
+        # so any scroll offset is one opaque area blit that covers the whole window
+        image = assets.opaque("assets/deserttileset/BG.png", WIN_SIZE, "white")
+        strip = pygame.Surface((2 * WIDTH, HEIGHT)).convert()
+        strip.blit(image, (0, 0))
+        strip.blit(image, (WIDTH, 0))
+        return strip
 
     def draw(self):
-        self.scene.window.blit(self.image, self.rect)
-        self.scene.window.blit(self.image, (self.rect.x + self.rect.width, self.rect.y))
+        x = self.rect.x + self.speed // 2 * self.scene.lag
+        self.scene.window.blit(self.image, (0, self.rect.y), (int(-x) % WIDTH, 0, WIDTH, HEIGHT))
 
         self.tilemap.draw()
 
+    def draw_pause_btn(self) -> pygame.Rect:
         if not self.scene.is_pause and self.scene.dino.alive:
             self.pause_btn.draw(self.scene.window, x=WIDTH - self.pause_btn.rect.width - 20, y=20)
             if self.pause_btn.is_clicked:
                 self.pause_btn.is_clicked = False
                 self.scene.is_pause = True
-                self.scene.pause_screen = PauseScreen(self.scene)
+                self.scene.pause_screen.reset()
+            return self.pause_btn.image.get_rect(topleft=(WIDTH - self.pause_btn.rect.width - 20, 20))
 
     def get_pause_btn(self):
-        image = load("assets/others/pause.png").convert_alpha()
-        image = scale(image, (60, 60))
+        image = assets.image("assets/others/pause.png", (60, 60))
         button = ImageButton(image, WIDTH - image.get_width() - 20, 20)
         return button
 
@@ -131,90 +109,72 @@ class Bg:
         if self.rect.x < -WIDTH:
             self.rect.x = 0
 
-    def get_ground(self):
-        return self.tilemap.tileset[0]
+        self.tilemap.update()
 
+    def reset(self):
+        self.rect.x = 0
+        self.tilemap.reset()
+        self.pause_btn.is_clicked = False
 
-class Obstacle:
-    START_SPEED = 2
-    SPEED = START_SPEED
-    START_ANIM_SPEED = 3
-    ANIM_SPEED = START_ANIM_SPEED
+    def get_ground(self) -> pygame.Rect:
+        return self.tilemap.rect
 
-    def __init__(self, scene, x, y):
-        self.scene: Scene = scene
 
-        self.obstacle_names = ("Crate", "StoneBlock", "Stone", "Cactus (1)", "Cactus (3)",)
+class Obstacle:
+    def __init__(self, scene, body: ObstacleBody):
+        self.obstacle_names = simulation.OBSTACLE_NAMES
         self.images: dict = self.get_images()
-        self.image_name = random.choice(tuple(self.images.keys()))
+        self.reset(scene, body)
+
+    def reset(self, scene, body: ObstacleBody):
+        self.scene: Scene = scene
+        self.body = body
+        self.serial = body.serial
+        self.image_name = body.kind
         self.frame_index = 0
         self.image: pygame.Surface = self.images[self.image_name][self.frame_index]
-        self.rect = self.image.get_rect(midbottom=(x, y))
+        self.rect = self.image.get_rect(topleft=(body.x, body.y))
+        self.prev_pos = self.rect.topleft
 
-        self.rotate_speed = self.SPEED
-        self.anim_speed = self.ANIM_SPEED
+        self.anim_speed = body.anim_speed
 
         self.is_active = True
 
-    @classmethod
-    def add_speed(cls):
-        cls.SPEED += 1
-
-    @classmethod
-    def retry_speed(cls):
-        cls.SPEED = cls.START_SPEED
-
-    @classmethod
-    def change_anim_speed(cls):
-        if cls.ANIM_SPEED > 1:
-            cls.ANIM_SPEED -= 1
-
-    @classmethod
-    def retry_anim_speed(cls):
-        cls.ANIM_SPEED = cls.START_ANIM_SPEED
-
     def get_images(self) -> dict:
         image_dict = dict()
 
         for name in self.obstacle_names:
-            image = load(f"assets/deserttileset/Objects/{name}.png").convert_alpha()
-            img_list = []
+            path = f"assets/deserttileset/Objects/{name}.png"
             if name.startswith("Cactus"):
-                image = scale(image, (CACTUS_WIDTH, CACTUS_HEIGHT))
-            elif name in ("Crate", "StoneBlock"):
-                image = scale(image, (CRATE_WIDTH, CRATE_HEIGHT))
-                r0_image = pygame.transform.rotate(image, 5)
-                r1_image = pygame.transform.rotate(image, 15)
-                r2_image = pygame.transform.rotate(image, 25)
-                r3_image = pygame.transform.rotate(image, 35)
-                r4_image = pygame.transform.rotate(image, 45)
-                r5_image = pygame.transform.rotate(image, 55)
-                r6_image = pygame.transform.rotate(image, 65)
-                r7_image = pygame.transform.rotate(image, 75)
-                r8_image = pygame.transform.rotate(image, 85)
-                img_list += [r0_image, r1_image, r2_image, r3_image, r4_image, r5_image, r6_image, r7_image, r8_image]
+                img_list = [assets.image(path, (CACTUS_WIDTH, CACTUS_HEIGHT))]
+            elif name in simulation.ROTATING_NAMES:
+                img_list = [assets.image(path, (CRATE_WIDTH, CRATE_HEIGHT))]
+                img_list += [assets.image(path, (CRATE_WIDTH, CRATE_HEIGHT), angle=angle) for angle in CRATE_ANGLES]
             else:
-                image = scale(image, (STONE_WIDTH, STONE_HEIGHT))
-            img_list.insert(0, image)
+                img_list = [assets.image(path, (STONE_WIDTH, STONE_HEIGHT))]
             image_dict[name] = img_list
+            if PIXEL_COLLISION:
+                for image in img_list:
+                    assets.mask(image)
 
         return image_dict
 
-    def draw(self):
-        self.scene.window.blit(self.image, self.rect)
+    def draw(self) -> pygame.Rect:
+        return self.scene.window.blit(self.image, self.scene.interpolate(self.prev_pos, self.rect))
 
     def update(self):
-        self.rect.x -= self.scene.bg.speed  # * self.scene.bg.tilemap.tileset[0].speed_force
-        if self.rect.x + 4 * self.rect.width < 0:
+        if not self.body.is_active or self.body.serial != self.serial:
             self.is_active = False
-            pass
+            return
 
-        if self.image_name in ("Crate", "StoneBlock"):
-            self.rect.x -= self.rotate_speed
-            if self.rotate_speed > 0:
-                self.animate()
-            else:
+        self.prev_pos = self.rect.topleft
+        self.rect.x = self.body.x
+
+        if self.image_name in simulation.ROTATING_NAMES:
+            if self.body.speed <= 0:
                 self.image = self.images[self.image_name][0]
+            elif self.scene.state.dino.alive:
+                self.animate()
 
     def animate(self):
         self.frame_index += 1
@@ -226,46 +186,43 @@ class Obstacle:
 
 
 class Helicopter:
-    START_SPEED = 2
-    SPEED = START_SPEED
+    def __init__(self, scene, body: ObstacleBody):
+        self.reset(scene, body)
 
-    def __init__(self, scene, width: int, height: int, x, y):
+    def reset(self, scene, body: ObstacleBody):
         self.scene: Scene = scene
-        self.images: tuple = self.get_images(width, height)
+        self.body = body
+        self.serial = body.serial
+        self.images: tuple = self.get_images(body.width, body.height)
         self.frame_index = 0
         self.image: pygame.Surface = self.images[self.frame_index]
-        self.rect = self.image.get_rect(midbottom=(x, y))
-        self.anim_speed = 2
-        self.speed = self.SPEED
+        self.rect = self.image.get_rect(topleft=(body.x, body.y))
+        self.prev_pos = self.rect.topleft
+        self.anim_speed = body.anim_speed
         self.is_active = True
 
-    @classmethod
-    def add_speed(cls):
-        cls.SPEED += 1
-
-    @classmethod
-    def retry_speed(cls):
-        cls.SPEED = cls.START_SPEED
-
     def get_images(self, width: int, height: int) -> tuple:
         images = []
         for i in range(1, 5):
-            image = load(f"assets/separated_frames/helicopter_{i * 2}.png").convert_alpha()
-            image = scale(image, (width, height))
-            image = pygame.transform.flip(image, True, False)
-            images.append(image)
+            images.append(assets.image(f"assets/separated_frames/helicopter_{i * 2}.png", (width, height),
+                                       flip=(True, False)))
+            if PIXEL_COLLISION:
+                assets.mask(images[-1])
         return tuple(images)
 
-    def draw(self):
-        self.scene.window.blit(self.image, self.rect)
+    def draw(self) -> pygame.Rect:
+        return self.scene.window.blit(self.image, self.scene.interpolate(self.prev_pos, self.rect))
         # pygame.draw.rect(self.scene.window, "red", self.rect, 2)
 
     def update(self):
-        self.animate()
-        if self.rect.x > -self.rect.width:
-            self.rect.x -= (self.scene.bg.speed + self.speed)
-        else:
+        if not self.body.is_active or self.body.serial != self.serial:
             self.is_active = False
+            return
+
+        self.prev_pos = self.rect.topleft
+        self.rect.x = self.body.x
+        if self.scene.state.dino.alive:
+            self.animate()
 
     def animate(self):
         self.frame_index += 1
@@ -277,64 +234,63 @@ class Helicopter:
 
 
 class Dino:
-    def __init__(self, scene, x, y, width, height):
+    def __init__(self, scene, x, y, width, height, body: DinoBody = None, mirror_states: tuple = ()):
         self.scene: Scene = scene
+        self.body = body
 
         self.width = width
         self.height = height
 
         self.images = self.get_images()
+        # Left-facing frames, built up front for the states the dino turns in and on first use for the rest
+        self.mirrored_images = self.get_images(flip=True, states=mirror_states)
+        self.start_pos = (x, y)
+        self.jump_anim_sped = 3
+        self.reset()
+
+    def reset(self):
         self.state = "Idle"
         self.frame_index = 0
         self.image: pygame.Surface = self.images[self.state][self.frame_index]
-        self.rect: pygame.Rect = self.image.get_rect(midbottom=(x, y))
+        self.rect: pygame.Rect = self.image.get_rect(midbottom=self.start_pos)
+        self.prev_pos = self.rect.topleft
 
         self.anim_speed = 6
-        self.jump_anim_sped = 3
         self.ANIM_SPEED = self.anim_speed
         self.direction = 0
         self.is_change_speed = False
 
         self.alive = True
 
-        self.is_jumping = False
-        self.on_ground = False
-        self.jump_force = -12 * SCALE
-        self.vel_y = 0
-
-        self.down_timer = DINO_DOWN_TIMER
-        self.down_ticks = 0
-        self.down_counter = 0
-
-        self.__cheet_live: bool = False
-
-    def get_images(self) -> dict:
+    def get_images(self, flip: bool = False, states: tuple = None) -> dict:
         image_dict: dict = {}
         main_path = "assets/dino"
-        dino_dirs = os.listdir(main_path)
+        dino_dirs = assets.listdir(main_path) if states is None else states
 
         for dino_dir in dino_dirs:
             image_list = []
-            dir_length = len(os.listdir(f"{main_path}/{dino_dir}"))
+            dir_length = len(assets.listdir(f"{main_path}/{dino_dir}"))
 
             for i in range(dir_length):
-                image = load(f"{main_path}/{dino_dir}/{dino_dir} ({i + 1}).png").convert_alpha()
-                image = scale(image, (self.width, self.height))
-                image_list.append(image)
+                image_list.append(assets.image(f"{main_path}/{dino_dir}/{dino_dir} ({i + 1}).png",
+                                               (self.width, self.height), flip=(flip, False)))
+                # Only the dino that plays can collide
+                if PIXEL_COLLISION and self.body is not None:
+                    assets.mask(image_list[-1])
 
             image_dict[dino_dir] = tuple(image_list)
 
         return image_dict
 
-    def draw(self):
-        self.scene.window.blit(self.image, self.rect)
+    def draw(self) -> pygame.Rect:
+        if self.body is not None:
+            return self.scene.window.blit(self.image, self.scene.interpolate(self.prev_pos, self.rect))
+        return self.scene.window.blit(self.image, self.rect)
 
     def update(self):
         self.animate()
-        if self.scene.game_class.is_active_start:
-            self.jump()
-            self.collide_obstacle()
-            self.check_down()
+        if self.body is not None:
+            self.follow()
         else:
             self.walk()
 
@@ -356,67 +312,26 @@ class Dino:
             if self.frame_index > len(self.images[self.state]) * self.anim_speed - 1:
                 self.frame_index = len(self.images[self.state]) * self.anim_speed - 1
 
-        image = self.images[self.state][self.frame_index // self.anim_speed]
-        self.image = pygame.transform.flip(image, flip_x=self.direction, flip_y=False)
+        self.image = self.get_frames(self.state)[self.frame_index // self.anim_speed]
 
-    def jump(self):
-        dy = 0
-        if self.is_jumping:
-            self.change_state("Jump")
+    def get_frames(self, state: str) -> tuple:
+        if not self.direction:
+            return self.images[state]
 
-            self.vel_y = self.jump_force
-            self.is_jumping = False
-            self.on_ground = False
+        frames = self.mirrored_images.get(state)
+        if frames is None:
+            frames = self.mirrored_images[state] = self.get_images(flip=True, states=(state,))[state]
+        return frames
 
-        if not self.on_ground:
-            self.vel_y += self.scene.game_class.GRAVITY
-            dy += self.vel_y
-
-        if self.rect.bottom + dy - self.rect.height // 7 > self.scene.bg.get_ground().rect.top:
-            dy = self.scene.bg.get_ground().rect.top - self.rect.bottom + self.rect.height // 7
-            self.on_ground = True
-            if self.alive:
-                self.change_state("Run")
-
-        self.rect.y += dy
+    def follow(self):
+        self.prev_pos = self.rect.topleft
+        self.rect.topleft = (self.body.x, self.body.y)
+        self.alive = self.body.alive
+        self.change_state(self.body.state)
 
     def cheet_live_active(self, value: bool):
-        if value is True:
-
-            self.__cheet_live = True
-        else:
-            self.__cheet_live = False
-
-
-
-    def collide_obstacle(self):
-        if self.alive:
-            for obstacle in self.scene.obstacle_list:
-                y = self.rect.y
-                if isinstance(obstacle, Obstacle):
-                    if obstacle.rect.colliderect(self.rect.x + 15, y, self.rect.width // 2,
-                                                 self.rect.height // 1.5):
-                        if not self.__cheet_live:
-                            self.alive = False
-                            self.change_state("Dead")
-                            self.scene.bg.speed = 0
-                            obstacle.rotate_speed = 0
-
-
-                else:
-                    y = 0
-                    if self.state == "Down":
-                        y += 20
-
-                    if (
-                            obstacle.rect.x - self.rect.width // 3 < self.rect.x < obstacle.rect.x - self.rect.width // 3 + obstacle.rect.width // 2) and \
-                            self.rect.top + 10 + y < obstacle.rect.bottom:
-                        if not self.__cheet_live:
-                            self.alive = False
-                            self.change_state("Dead")
-                            self.scene.bg.speed = 0
-                            obstacle.rotate_speed = 0
-
+        self.body.immortal = value is True
+        self.scene.log.cheat(self.scene.state.tick + 1, self.body.immortal)
 
     def change_state(self, new_state: str):
         if self.state != new_state:
@@ -442,13 +357,6 @@ class Dino:
                     self.change_state("Idle")
                     self.direction = 0 if self.direction == 1 else 1
 
-    def check_down(self):
-        if self.alive and self.state == "Down":
-            self.down_counter += 1
-            if self.down_counter > self.down_timer:
-                self.down_counter = 0
-                self.change_state("Run")
-
 
 class Button:
     def __init__(self, image, x, y):
@@ -506,7 +414,7 @@ class ImageButton(Button):
 class Console:
     def __init__(self, _class):
         self._class: PauseScreen = _class
-        self.font = SysFont("sans", 20)
+        self.font = assets.font("sans", 20)
         self.surface = pygame.Surface(self._class.rect.size)
         self.rect = self.surface.get_rect(topleft=(0, 0))
         self.commands = self._class.scene.game_class.commands
@@ -578,12 +486,11 @@ class Console:
         if self.input_active:
             self.color = "red"
             text = self.text + "|"
-            self.input_table = self.font.render(text, False, "white")
+            self.input_table = texts.render(self.font, text, False, "white")
             self.surface.blit(self.input_table, self.input_rect)
 
     def get_close_button(self):
-        image = load("assets/others/close.png").convert_alpha()
-        image = scale(image, (40, 40))
+        image = assets.image("assets/others/close.png", (40, 40))
         return ImageButton(image, 0, 0)
 
     def check_command(self, command: str):
@@ -598,17 +505,32 @@ class Console:
 class Write:
     def __init__(self, scene, text: str):
         self.scene: Scene = scene
-        self.font = SysFont("tlwgtypo", int(40 * WIN_SCALE), True)
+        self.font = assets.font("tlwgtypo", int(40 * WIN_SCALE), True)
         self.text = text
         self.value = 0
 
-    def draw(self, x: int, y: int, value: int | str, color: str | tuple = "darkred"):
+        self.text_render: pygame.Surface = None
+        self.rendered: tuple = None
+
+    def draw(self, x: int, y: int, value: int | str, color: str | tuple = "darkred") -> pygame.Rect:
         if self.value < value:
             self.value = value
-        self.text_render = self.font.render(f"{self.text}: {self.value}", True, color)
-        self.scene.window.blit(self.text_render, (x, y))
+        if self.rendered != (self.value, color):
+            self.rendered = (self.value, color)
+            self.text_render = texts.render(self.font, f"{self.text}: {self.value}", True, color)
+        return self.scene.window.blit(self.text_render, (x, y))
+
+    def reset(self):
+        self.value = 0
+        self.rendered = None
+
+    def draw_timer(self, x: int, y: int, value: int | str, color: str | tuple = "white") -> pygame.Rect:
+        if self.rendered != (value, color):
+            self.rendered = (value, color)
+            self.text_render = texts.render(self.font, self.format_timer(value), True, color)
+        return self.scene.window.blit(self.text_render, (x, y))
 
-    def draw_timer(self, x: int, y: int, value: int | str, color: str | tuple = "white"):
+    def format_timer(self, value: int) -> str:
         minutes = 0
         if value > 60:
             minutes = value // 60
@@ -621,8 +543,7 @@ class Write:
         if seconds < 10:
             seconds = "0" + str(seconds)
 
-        self.text_render = self.font.render(f"{self.text}: {minutes}:{seconds}", True, color)
-        self.scene.window.blit(self.text_render, (x, y))
+        return f"{self.text}: {minutes}:{seconds}"
 
 
 class StartScreen:
@@ -632,13 +553,16 @@ class StartScreen:
         self.window = pygame.display.get_surface()
         self.clock = pygame.time.Clock()
 
-        self.font = SysFont("tlwgtypo", int(50 * WIN_SCALE), True)
-        self.font2 = SysFont("tlwgtypo", int(300 * WIN_SCALE), True)
+        # Its own, how many timers it draws depends on wall-clock time and must not shift the game seeds
+        self.rng = random.Random()
+        self.font = assets.font("tlwgtypo", int(50 * WIN_SCALE), True)
+        self.font2 = assets.font("tlwgtypo", int(300 * WIN_SCALE), True)
         self.image = self.get_bg_image()
         self.rect = self.image.get_rect(topleft=(0, 0))
 
         self.start_btn: Button = self.get_start_button()
         self.quit_btn: Button = self.get_quit_button()
+        self.dino_text: tuple = self.get_dino_text("lime")
 
         self.loading_width = 300
         self.l_width = 0
@@ -661,17 +585,24 @@ class StartScreen:
         self.is_feed = True
 
         self.is_restart = is_restart
-        self.change_state_timer = random.randint(5000, 10000)
+        self.change_state_timer = self.rng.randint(5000, 10000)
         self.change_state_counter = pygame.time.get_ticks()
         self.animate_dino_scale = 6 * WIN_SCALE
         self.animate_dino = Dino(self.game_class.scene, (100 * self.animate_dino_scale) / 2, HEIGHT - 100 * WIN_SCALE,
-                                 100 * self.animate_dino_scale, 80 * self.animate_dino_scale)
+                                 100 * self.animate_dino_scale, 80 * self.animate_dino_scale,
+                                 mirror_states=("Idle", "Walk"))
 
-    def get_bg_image(self):
-        bg_image = load("assets/deserttileset/BG2.png").convert_alpha()
-        bg_image = scale(bg_image, WIN_SIZE).convert()
+    def reset(self, is_restart: bool = True):
+        self.running = True
+        self.is_restart = is_restart
+        self.start_btn.is_clicked = False
+        self.quit_btn.is_clicked = False
+        self.change_state_timer = self.rng.randint(5000, 10000)
+        self.change_state_counter = pygame.time.get_ticks()
+        self.animate_dino.reset()
 
-        return bg_image
+    def get_bg_image(self):
+        return assets.image("assets/deserttileset/BG2.png", WIN_SIZE, alpha=False)
 
     def get_start_button(self, color: str | tuple = "black") -> Button:
         image = self.font.render(f"Start", True, color)
@@ -739,62 +670,61 @@ class StartScreen:
                          border_radius=10, )
 
     def run(self):
-
-        dino_text_image, dino_text_rect = self.get_dino_text("lime")
-
         while self.running:
-            self.window.fill("white")
-            self.window.blit(self.image, self.rect)
-            self.window.blit(dino_text_image, dino_text_rect)
+            self.frame()
+            self.clock.tick(self.game_class.FPS)
+
+    def frame(self):
+        self.window.blit(self.image, self.rect)
+        self.window.blit(*self.dino_text)
 
-            if self.is_feed and not self.is_restart:
-                self.draw_surface()
+        if self.is_feed and not self.is_restart:
+            self.draw_surface()
+        else:
+            if not self.is_loaded and not self.is_restart:
+                if self.l_width < self.loading_width:
+                    self.l_width += self.load_speed
+                    if self.load_speed > 2.9:
+                        self.load_speed -= 0.4
+                else:
+                    self.l_width = 0
+                    self.is_loaded = True
+                self.draw_loading()
+                self.change_state_counter = pygame.time.get_ticks()
             else:
-                if not self.is_loaded and not self.is_restart:
-                    if self.l_width < self.loading_width:
-                        self.l_width += self.load_speed
-                        if self.load_speed > 2.9:
-                            self.load_speed -= 0.4
-                    else:
-                        self.l_width = 0
-                        self.is_loaded = True
-                    self.draw_loading()
+                self.draw_bg()
+                current_time_counter = pygame.time.get_ticks()
+                if current_time_counter - self.change_state_counter > self.change_state_timer:
                     self.change_state_counter = pygame.time.get_ticks()
-                else:
-                    self.draw_bg()
-                    current_time_counter = pygame.time.get_ticks()
-                    if current_time_counter - self.change_state_counter > self.change_state_timer:
-                        self.change_state_counter = pygame.time.get_ticks()
-                        self.change_state_timer = random.randint(5000, 10000)
-                        self.animate_dino.change_state("Walk")
-
-                    self.animate_dino.draw()
-                    self.animate_dino.update()
-
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
+                    self.change_state_timer = self.rng.randint(5000, 10000)
+                    self.animate_dino.change_state("Walk")
+
+                self.animate_dino.draw()
+                self.animate_dino.update()
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+                self.game_class.play = False
+            if event.type == pygame.KEYDOWN:
+
+                if event.key == pygame.K_t:
+                    self.game_class.scene.take_screenshot()
+                if event.key == pygame.K_ESCAPE:
                     self.running = False
                     self.game_class.play = False
-                if event.type == pygame.KEYDOWN:
-
-                    if event.key == pygame.K_t:
-                        self.game_class.scene.take_screenshot()
-                    if event.key == pygame.K_ESCAPE:
-                        self.running = False
-                        self.game_class.play = False
 
-                    if event.key == pygame.K_RETURN and self.is_loaded:
-                        self.game_class.is_active_start = True
-                        self.running = False
+                if event.key == pygame.K_RETURN and self.is_loaded:
+                    self.game_class.is_active_start = True
+                    self.running = False
 
-            pygame.display.update()
-            self.clock.tick(self.game_class.FPS)
+        pygame.display.update()
 
 
 class FailScreen:
     def __init__(self, scene, font_name: str = None, font_size: int = None):
         self.scene: Scene = scene
-        self.font = SysFont(font_name, int(font_size * WIN_SCALE), True)
+        self.font = assets.font(font_name, int(font_size * WIN_SCALE), True)
 
         self.surface = pygame.Surface(WIN_SIZE)
         self.surface.fill("black")
@@ -808,6 +738,13 @@ class FailScreen:
 
         self.taken_image = None
 
+    def reset(self):
+        self.rect.y = -HEIGHT
+        self.taken_image = None
+        self.restart_btn.is_clicked = False
+        self.quit_btn.is_clicked = False
+        self.start_screen_btn.is_clicked = False
+
     def get_restart_button(self, color: str | tuple = "black") -> Button:
         image = self.font.render(f"Restart", True, color)
         btn = Button(
@@ -818,10 +755,8 @@ class FailScreen:
 
         return btn
 
-    def get_taken_screenshot(self):
-        image_name = os.listdir("screenshots")[-1]
-        image = load(f"screenshots/{image_name}").convert_alpha()
-        image = pygame.transform.smoothscale(image, (WIDTH // 3, HEIGHT // 3))
+    def get_taken_screenshot(self, screenshot: pygame.Surface):
+        image = pygame.transform.smoothscale(screenshot, (WIDTH // 3, HEIGHT // 3)).convert_alpha()
         image = pygame.transform.rotate(image, 15)
         return image
 
@@ -862,31 +797,33 @@ class FailScreen:
     def draw_buttons(self):
 
         if self.start_screen_btn.draw(self.scene.window):
-            self.scene.running = False
-            self.scene.game_class.scene = Scene(self.scene.game_class)
-            self.scene.game_class.start_screen = StartScreen(self.scene.game_class, is_restart=True)
-            self.scene.game_class.is_active_start = False
-            self.scene.game_class.GRAVITY = GRAVITY
+            self.home()
 
         elif self.quit_btn.draw(self.scene.window):
             self.scene.game_class.play = False
             self.scene.running = False
 
         elif self.restart_btn.draw(self.scene.window):
-            self.scene.game_class.start_screen = StartScreen(self.scene.game_class, is_restart=True)
-            self.scene.game_class.scene = Scene(self.scene.game_class)
-            self.scene.running = False
-            self.scene.game_class.GRAVITY = GRAVITY
-            Helicopter.retry_speed()
-            Obstacle.retry_anim_speed()
-            Obstacle.retry_speed()
+            self.restart()
+
+    def home(self):
+        self.scene.save_log()
+        self.scene.reset()
+        self.scene.game_class.start_screen.reset(is_restart=True)
+        self.scene.game_class.is_active_start = False
+        self.scene.running = False
+
+    def restart(self):
+        self.scene.save_log()
+        self.scene.reset()
+        self.scene.running = False
 
 
 class PauseScreen:
     def __init__(self, scene):
         self.scene: Scene = scene
 
-        self.font = SysFont("arial", int(40 * WIN_SCALE), True)
+        self.font = assets.font("arial", int(40 * WIN_SCALE), True)
 
         self.surface = pygame.Surface((WIDTH // 2, HEIGHT // 2))
         self.surface.fill("white")
@@ -905,6 +842,16 @@ class PauseScreen:
         self.console = Console(self)
         self.console_active = False
 
+    def reset(self):
+        self.surface.fill("white")
+        self.y = - self.surface.get_height()
+        self.is_finished = False
+        self.play_btn.is_clicked = False
+        self.console_btn.is_clicked = False
+        self.console_active = False
+        self.console.text = ""
+        self.console.input_active = False
+
     def draw_surface(self, color: str | tuple = "aqua"):
         # self.surface.fill(color)
         self.scene.window.blit(self.surface, self.rect)
@@ -937,16 +884,14 @@ class PauseScreen:
             self.console.draw()
 
     def get_play_button(self):
-        image = load("assets/others/play.png").convert_alpha()
-        image = scale(image, (100, 100))
+        image = assets.image("assets/others/play.png", (100, 100))
         return ImageButton(image,
                            self.rect.x + (self.rect.width - image.get_width()) // 2 - 75,
                            self.rect.y + (self.rect.height - image.get_height()) // 2
                            )
 
     def get_console_button(self):
-        image = load("assets/others/command-line.png").convert_alpha()
-        image = scale(image, (100, 100))
+        image = assets.image("assets/others/command-line.png", (100, 100))
         return ImageButton(image,
                            self.rect.x + (self.rect.width - image.get_width()) // 2 + 75,
                            self.rect.y + (self.rect.height - image.get_height()) // 2
@@ -959,264 +904,319 @@ class Scene:
 
         self.game_class: Game = game_class
 
-        self.window: pygame.Surface = pygame.display.set_mode(WIN_SIZE)
+        self.window: pygame.Surface = pygame.display.get_surface() or pygame.display.set_mode(WIN_SIZE)
         pygame.display.set_caption('Dino')
         self.clock = pygame.time.Clock()
 
-        self.bg_speed = 4
+        self.state = GameState(self.game_class.rng.randrange(2 ** 32))
+        if PIXEL_COLLISION:
+            self.state.overlap = self.overlap
+        self.log = InputLog(self.state.seed, PIXEL_COLLISION)
+        self.inputs: int = simulation.NONE
+        # Unsimulated time carried between frames, and how far the frame is into the next tick
+        self.accumulator: float = 0
+        self.alpha: float = 1
+        self.renderer: DirtyRenderer = DirtyRenderer(self.window) if DIRTY_RECTS else None
+
         self.running = True
         self.is_pause = False
-        self.is_freeze = True
-        self.is_change_speed = False
 
         self.fail_screen = FailScreen(self, "tlwgtypo", int(40 * SCALE))
         self.pause_screen: PauseScreen = PauseScreen(self)
-        self.dino = Dino(self, 200 * SCALE, HEIGHT - 3 * TILE_SIZE, DINO_WIDTH, DINO_HEIGHT)
+        self.dino = Dino(self, 200 * SCALE, HEIGHT - 3 * TILE_SIZE, DINO_WIDTH, DINO_HEIGHT, body=self.state.dino)
         self.bg = Bg(self)
 
-        self.obstacle_list: list = []
-        self.obstacle_dict: dict = {}
-        self.generate_duration: int = 200
-        self.generate_ticks: int = 0
-        self.generate_counter: int = 0
+        self.obstacles = EntityPool()
+        self.obstacle_list: list = self.obstacles.live
 
-        self.rotate_ticks: int = 0
-        self.generate_random: int = 0
-        self.timer: int = 0
-        self.timer_counter: int = 0
+        self.font = assets.font("tlwgtypo", int(100 * WIN_SCALE), True)
 
-        self.font = SysFont("tlwgtypo", int(100 * WIN_SCALE), True)
-
-        self.score: int = 0
         self.score_table = Write(self, "Score")
         self.bg_speed_table = Write(self, "BG Speed")
         self.timer_table = Write(self, "Timer")
         self.take_scr = True
         self.saved_key = None
+        self.reset_ms: float = None
 
-    def take_screenshot(self):
-        os.makedirs("screenshots", exist_ok=True)
-        # time_taken = time.asctime(time.localtime(time.time()))
-        # time_taken = time_taken.replace(" ", "_")
-        # time_taken = time_taken.replace(":", "_")
-        generate = 1
-        file_name = f"{generate}.png"
-        while file_name in os.listdir("screenshots"):
-            file_name = f"{generate}.png"
-            generate += 1
-        save_file = f"screenshots/{file_name}"
-        pygame.image.save(self.window, save_file)
-
-    def get_freeze_state(self, freeze_start_time, seconds=4):
-        current_freeze_time = time.perf_counter()
-        if current_freeze_time - freeze_start_time < seconds:
-            self.bg.speed = 0
-            self.dino.change_state("Idle")
-        else:
-            self.bg.speed = self.bg_speed
-            self.dino.change_state("Run")
-            self.is_freeze = False
+    @property
+    def score(self) -> float:
+        return self.state.score
 
-        return int((current_freeze_time - freeze_start_time) // 1), seconds
+    @property
+    def timer(self) -> int:
+        return self.state.timer
 
-    def generate_obstacle(self):
-        generate_type_number = random.randint(1, 10)
+    def take_screenshot(self) -> pygame.Surface:
+        return screenshots.save(self.window)
 
-        if self.generate_counter > self.generate_duration:
-            self.generate_counter = 0
-            if generate_type_number < 8:
-                x = random.randint(WIDTH + self.generate_random, WIDTH + 100 + self.generate_random)
-                obstacle = Obstacle(self, x, HEIGHT - 2 * TILE_SIZE + 5)
-            else:
-                x = random.randint(WIDTH + 10, WIDTH + 20)
-                obstacle = Helicopter(self, HELICOPTER_WIDTH, int(HELICOPTER_HEIGHT), x,
-                                      HEIGHT - 2 * TILE_SIZE - self.dino.height // 1.5)
-
-            self.obstacle_list.append(obstacle)
-            self.generate_ticks = pygame.time.get_ticks()
+    def get_freeze_time(self, seconds=simulation.FREEZE_SECONDS):
+        passed_ticks = seconds * TICK_RATE - self.state.freeze_left
+        return passed_ticks // TICK_RATE, seconds
 
-    def draw_freeze_time(self, freeze_time):
+    def draw_freeze_time(self, freeze_time) -> pygame.Rect:
         result = freeze_time[1] - freeze_time[0] - 1
 
         if result < 1:
             result = "GO GO"
         text = f"{result}"
-        image = self.font.render(text, True, "darkred")
+        image = texts.render(self.font, text, True, "darkred")
         rect = image.get_rect(topleft=((WIDTH - image.get_width()) // 2, (HEIGHT - image.get_height()) // 2))
 
-        self.window.blit(image, rect)
+        return self.window.blit(image, rect)
 
-    def run(self):
-        freeze_start_time = time.perf_counter()
-        self.generate_ticks = pygame.time.get_ticks()
-        self.rotate_ticks = pygame.time.get_ticks()
+    @property
+    def lag(self) -> float:
+        return 1 - self.alpha
 
-        image = cv2.imread("screenshots/1.png")
+    def interpolate(self, prev_pos: tuple, rect: pygame.Rect) -> tuple:
+        return (
+            prev_pos[0] + (rect.x - prev_pos[0]) * self.alpha,
+            prev_pos[1] + (rect.y - prev_pos[1]) * self.alpha,
+        )
 
-        while self.running:
-            self.window.fill("white")
+    def load_state(self, state: GameState, pixel_collision: bool = PIXEL_COLLISION):
+        self.state = state
+        self.inputs = simulation.NONE
+        self.accumulator = 0
+        self.alpha = 1
+        self.obstacles.clear()
+        self.dino.body = state.dino
+        self.dino.follow()
+        self.dino.prev_pos = self.dino.rect.topleft
+        if pixel_collision:
+            state.overlap = self.overlap
+        self.log = InputLog(state.seed, pixel_collision)
+
+    def reset(self, seed: int = None, schedule=None, pixel_collision: bool = PIXEL_COLLISION):
+        """Starts a new game on the sprites, surfaces and window already loaded."""
+        started = time.perf_counter()
+        if seed is None:
+            seed = self.game_class.rng.randrange(2 ** 32)
+
+        self.dino.reset()
+        self.load_state(GameState(seed, schedule), pixel_collision)
+        self.is_pause = False
+        self.take_scr = True
+        self.saved_key = None
+
+        self.bg.reset()
+        self.fail_screen.reset()
+        self.pause_screen.reset()
+        for table in (self.score_table, self.bg_speed_table, self.timer_table):
+            table.reset()
+        if self.renderer is not None:
+            self.renderer.reset()
+        self.reset_ms = (time.perf_counter() - started) * 1000
+
+    def overlap(self, dino: DinoBody, body: ObstacleBody) -> bool:
+        # Pixel-perfect narrow phase for simulation.collide_obstacles, on the frames currently shown
+        for obstacle in self.obstacle_list:
+            if obstacle.body is body and obstacle.serial == body.serial:
+                break
+        else:
+            return simulation.collides(dino, body)
+
+        dino_rect = self.dino.image.get_rect(topleft=(dino.x, dino.y))
+        obstacle_rect = obstacle.image.get_rect(topleft=(body.x, body.y))
+        if not dino_rect.colliderect(obstacle_rect):
+            return False
+
+        offset = (obstacle_rect.x - dino_rect.x, obstacle_rect.y - dino_rect.y)
+        return assets.mask(self.dino.image).overlap(assets.mask(obstacle.image), offset) is not None
 
+    def mark(self, rect: pygame.Rect):
+        if self.renderer is not None:
+            self.renderer.mark(rect)
+
+    def draw_world(self):
+        static = self.is_pause or self.bg.speed == 0
+        if self.renderer is None or self.renderer.begin(static):
             self.bg.draw()
-            if not self.is_pause:
-                self.bg.update()
+            if self.renderer is not None and static:
+                self.renderer.capture()
+        else:
+            self.renderer.restore()
+        probes.lap("background")
 
-            self.score_table.draw(20, 20, int(self.score))
-            self.bg_speed_table.draw(20, 70, self.bg.speed)
-            self.timer_table.draw_timer(20, 120, self.timer, "black")
+        self.mark(self.bg.draw_pause_btn())
 
-            if self.is_freeze and not self.is_pause:
-                freeze_time = self.get_freeze_state(freeze_start_time)
-                self.draw_freeze_time(freeze_time)
-            else:
-                freeze_start_time = time.perf_counter()
-
-            if self.dino.alive and not self.is_pause and not self.is_freeze:
-                self.generate_obstacle()
-                self.generate_counter += 1
-                self.timer_counter += 1
-
-                if self.timer_counter >= self.game_class.FPS:
-                    self.timer_counter = 0
-                    self.timer += 1
-
-            if self.obstacle_list:
-                for index, obstacle in enumerate(self.obstacle_list):
-                    if obstacle.is_active:
-                        obstacle.draw()
-
-                        if self.dino.alive and not self.is_pause:
-                            obstacle.update()
-                    # else:
-                    #     self.obstacle_list.pop(index)
-
-            self.dino.draw()
-            if not self.is_pause:
-                self.dino.update()
-
-            if not self.is_freeze and not self.is_pause and self.dino.alive:
-                self.score += 0.1 * 20
-
-                self.dino.jump_force = -12 * SCALE - 20
-                self.game_class.GRAVITY = 0.55 * SCALE + 2
-
-                if int(self.score) != 0:
-                    if not round(self.score, 2) % 100:
-                        if self.bg.speed < 16:
-                            self.bg.speed += 1
-                            # self.dino.jump_force -= 1
-                            # self.game_class.GRAVITY += 0.1
-
-                        if self.dino.down_timer > 20:
-                            self.dino.down_timer -= 2
-
-                    if not round(self.score, 2) % 175 and self.dino.anim_speed > 2:
-                        self.dino.is_change_speed = True
-
-                    if not round(self.score, 2) % 250 and self.generate_duration > 33:
-                        self.generate_duration -= 20
-                        if self.generate_duration < 33:
-                            self.generate_duration = 33
-
-                    if not round(self.score, 2) % 200:
-                        if Helicopter.SPEED < 3:
-                            Helicopter.add_speed()
-                        if Obstacle.SPEED < 3:
-                            Obstacle.add_speed()
-                        Obstacle.change_anim_speed()
-
-            if self.is_pause:
-                self.pause_screen.draw_surface()
-
-            if not self.dino.alive and not self.is_pause:
-                self.fail_screen.draw_surface()
-                if self.take_scr:
-                    self.take_screenshot()
-                    self.fail_screen.taken_image = self.fail_screen.get_taken_screenshot()
-                    self.take_scr = False
+        for obstacle in self.obstacle_list:
+            self.mark(obstacle.draw())
+        probes.lap("obstacle_draw")
 
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    self.running = False
-                    self.game_class.play = False
+        self.mark(self.dino.draw())
+        probes.lap("dino_draw")
 
-                if event.type == pygame.KEYDOWN:
-                    if self.pause_screen.console_active and self.pause_screen.console.input_active:
-                        key = event.key
-                        if event.key in (1073742053, 1073742049):
-                            self.saved_key = event.key
-                            continue
-                        if self.saved_key is not None:
-                            self.saved_key = None
-                            if event.key == 45:
-                                key += 50
-                            elif event.key == 59:
-                                key -= 1
-                        if event.key == 8:
-                            self.pause_screen.console.text = self.pause_screen.console.text[:-1]
-                        else:
-                            try:
-                                self.pause_screen.console.text += event.unicode
-                            except Exception as e:
-                                print(e)
-                        if event.key == pygame.K_RETURN:
-                            self.pause_screen.console.commands.append(
-                                self.pause_screen.console.font.render(
-                                    self.pause_screen.console.text,
-                                    True,
-                                    'white'
-                                )
-                            )
-                            self.pause_screen.console.check_command(self.pause_screen.console.text)
-                            self.pause_screen.console.text = ""
+    def advance(self):
+        self.bg.update()
+        if self.inputs:
+            self.log.record(self.state.tick + 1, self.inputs)
+        simulation.step(self.state, self.inputs)
+        self.inputs = simulation.NONE
+        probes.lap("simulation")
 
-                    if event.key == pygame.K_ESCAPE:
-                        if self.pause_screen.console_active:
-                            self.pause_screen.console_active = False
-                        elif self.is_pause:
-                            self.is_pause = False
-                        else:
-                            self.running = False
-                            self.game_class.play = False
+        for event in self.state.events:
+            if event[0] == "spawn":
+                body: ObstacleBody = event[1]
+                self.obstacles.spawn(Helicopter if body.is_helicopter else Obstacle, self, body)
+            elif event[0] == "anim_speedup" and self.dino.ANIM_SPEED > self.state.dino_anim_speed:
+                self.dino.is_change_speed = True
 
-                    if event.key == pygame.K_t:
-                        self.take_screenshot()
+        for obstacle in self.obstacle_list:
+            obstacle.update()
+        self.obstacles.prune()
+        probes.lap("obstacle_update")
 
+        self.dino.update()
+        probes.lap("dino_update")
 
-                    if not self.is_pause:
+    def run(self):
+        self.running = True
+        self.clock.tick()
 
-                        if event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP):
-                            if self.dino.alive and self.dino.on_ground and self.dino.state != "Idle":
-                                self.dino.is_jumping = True
+        while self.running:
+            self.frame(min(self.clock.tick(self.game_class.FPS) / 1000, MAX_FRAME_TIME))
 
-                        if event.key in (pygame.K_s, pygame.K_DOWN) and self.dino.state not in ("Idle", "Down", "Jump"):
-                            self.dino.change_state("Down")
-                            self.dino.down_ticks = pygame.time.get_ticks()
+        self.save_log()
 
-                        if event.key == pygame.K_r:
-                            self.is_pause = not self.is_pause
+    def frame(self, frame_time: float):
+        probes.frame()
+        if self.is_pause:
+            self.accumulator = 0
+            self.alpha = 1
+        else:
+            self.accumulator += frame_time
+            while self.accumulator >= TICK_TIME:
+                self.advance()
+                self.accumulator -= TICK_TIME
+            self.alpha = self.accumulator / TICK_TIME
+
+        self.draw_world()
+
+        self.mark(self.score_table.draw(20, 20, int(self.score)))
+        self.mark(self.bg_speed_table.draw(20, 70, self.bg.speed))
+        self.mark(self.timer_table.draw_timer(20, 120, self.timer, "black"))
+
+        if self.state.is_freeze and not self.is_pause:
+            self.mark(self.draw_freeze_time(self.get_freeze_time()))
+        self.mark(probes.draw(self.window))
+        probes.lap("hud")
+
+        if self.is_pause:
+            self.pause_screen.draw_surface()
+            self.mark(self.pause_screen.rect)
+
+        if not self.dino.alive and not self.is_pause:
+            self.fail_screen.draw_surface()
+            self.mark(self.fail_screen.rect)
+            if self.take_scr:
+                self.fail_screen.taken_image = self.fail_screen.get_taken_screenshot(self.take_screenshot())
+                self.take_scr = False
+        probes.lap("overlays")
+
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT:
+                self.running = False
+                self.game_class.play = False
+
+            if event.type == pygame.KEYDOWN:
+                if self.pause_screen.console_active and self.pause_screen.console.input_active:
+                    key = event.key
+                    if event.key in (1073742053, 1073742049):
+                        self.saved_key = event.key
+                        continue
+                    if self.saved_key is not None:
+                        self.saved_key = None
+                        if event.key == 45:
+                            key += 50
+                        elif event.key == 59:
+                            key -= 1
+                    if event.key == 8:
+                        self.pause_screen.console.text = self.pause_screen.console.text[:-1]
+                    else:
+                        try:
+                            self.pause_screen.console.text += event.unicode
+                        except Exception as e:
+                            print(e)
+                    if event.key == pygame.K_RETURN:
+                        self.pause_screen.console.commands.append(
+                            self.pause_screen.console.font.render(
+                                self.pause_screen.console.text,
+                                True,
+                                'white'
+                            )
+                        )
+                        self.pause_screen.console.check_command(self.pause_screen.console.text)
+                        self.pause_screen.console.text = ""
+
+                if event.key == pygame.K_ESCAPE:
+                    if self.pause_screen.console_active:
+                        self.pause_screen.console_active = False
+                    elif self.is_pause:
+                        self.is_pause = False
+                    else:
+                        self.running = False
+                        self.game_class.play = False
+
+                if event.key == pygame.K_t:
+                    self.take_screenshot()
+
+                if event.key == pygame.K_F3:
+                    probes.visible = not probes.visible
+                    probes.enable(probes.visible or PROBES)
+
+                if not self.is_pause:
 
+                    if event.key in (pygame.K_SPACE, pygame.K_w, pygame.K_UP):
+                        self.inputs |= simulation.JUMP
+
+                    if event.key in (pygame.K_s, pygame.K_DOWN):
+                        self.inputs |= simulation.DUCK
+
+                    if event.key == pygame.K_r:
+                        self.is_pause = not self.is_pause
+        probes.lap("events")
+
+        if self.renderer is not None:
+            self.renderer.present()
+        else:
             pygame.display.update()
-            self.clock.tick(self.game_class.FPS)
+        probes.lap("display")
+
+    def save_log(self):
+        if self.state.tick:
+            self.log.finish(self.state)
+            self.log.save(f"{REPLAY_DIR}/{self.state.seed}.log")
 
 
 class Game:
 
-    def __init__(self):
-        self.FPS = 60
+    def __init__(self, bundle: str = ASSET_BUNDLE, seed: int = None):
+        # Deals the seed of every game played, so a session's games depend only on its seed and their number
+        self.rng = random.Random(seed)
+
+        pygame.init()
+        pygame.display.set_mode(WIN_SIZE)
+        if bundle:
+            assets.load_bundle(bundle)
+        if PROBES:
+            probes.enable()
+
+        self.FPS = FPS
         self.play = True
         self.commands = []
 
-        self.GRAVITY = GRAVITY * SCALE
-
         self.scene = Scene(self)
         self.start_screen = StartScreen(self, )
         self.is_active_start = True if DEBUG else False
 
     def remove_dirs(self):
-        image_names = os.listdir("screenshots")
+        screenshots.flush()
+        image_names = os.listdir(screenshots.directory)
         while image_names:
             image_name = image_names.pop()
-            os.remove(f"screenshots/{image_name}")
+            os.remove(f"{screenshots.directory}/{image_name}")
+        screenshots.reset()
 
     def run(self):
         while self.play:
@@ -1226,9 +1226,20 @@ class Game:
             else:
                 self.start_screen.run()
                 # self.scene.run()
+        screenshots.flush()
+        if probes.frames:
+            probes.export(f"{PROBE_DIR}/{time.strftime('%Y%m%d-%H%M%S')}")
 
 
 if __name__ == '__main__':
     game = Game()
     game.run()
+    if DEBUG:
+        print("assets:", assets.stats())
+        print("texts:", texts.stats())
+        print("screenshots:", screenshots.stats())
+        if game.scene.renderer is not None:
+            print("dirty rects:", game.scene.renderer.stats())
+        if game.scene.reset_ms is not None:
+            print(f"last restart: {game.scene.reset_ms:.2f} ms")
     pygame.quit()
@@ -0,0 +1,289 @@
+import numpy as np
+
+from difficulty import Schedule
+from settings import WIDTH, TILE_SIZE, GROUND_Y, GRAVITY, SCALE, TICK_RATE, DINO_WIDTH, DINO_HEIGHT, DINO_DOWN_TIMER
+from simulation import (
+    NONE, JUMP, DUCK,
+    BG_START_SPEED, FREEZE_SECONDS, GENERATE_DURATION, DEFAULT_SCHEDULE,
+    OBSTACLE_START_SPEED, HELICOPTER_START_SPEED, OBSTACLE_NAMES, ROTATING_NAMES, OBSTACLE_SIZES,
+    DINO_HITBOX, HELICOPTER_HEAD, HELICOPTER_DUCK, HIT_SPANS,
+)
+
+STATES = ("Idle", "Run", "Jump", "Down", "Dead")
+IDLE, RUN, JUMPING, DOWN, DEAD = range(len(STATES))
+
+KINDS = OBSTACLE_NAMES + ("Helicopter",)
+HELICOPTER = KINDS.index("Helicopter")
+KIND_WIDTH = np.array([OBSTACLE_SIZES[kind][0] for kind in KINDS], dtype=np.float64)
+KIND_HEIGHT = np.array([OBSTACLE_SIZES[kind][1] for kind in KINDS], dtype=np.float64)
+KIND_ROTATES = np.array([kind in ROTATING_NAMES for kind in KINDS])
+KIND_SPAN_LOW = np.array([HIT_SPANS[kind][0] for kind in KINDS], dtype=np.float64)
+KIND_SPAN_HIGH = np.array([HIT_SPANS[kind][1] for kind in KINDS], dtype=np.float64)
+# Schedule fields with an array here; animation speeds only matter to the renderer
+SCHEDULE_FIELDS = ("bg_speed", "down_timer", "generate_duration", "obstacle_speed", "helicopter_speed")
+
+
+def sweep(start, end, low, high) -> tuple:
+    # simulation.sweep over arrays
+    delta = end - start
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t0 = (low - start) / delta
+        t1 = (high - start) / delta
+    inside = (low < start) & (start < high)
+    still = delta == 0
+    first = np.where(still, np.where(inside, 0.0, 1.0), np.maximum(np.minimum(t0, t1), 0.0))
+    last = np.where(still, np.where(inside, 1.0, 0.0), np.minimum(np.maximum(t0, t1), 1.0))
+    return first, last
+
+
+class BatchSimulation:
+    """Steps ``n`` independent games at once with the rules of ``simulation.step``.
+
+    Every per-game value lives in a NumPy array indexed by game, obstacles in
+    ``(n, capacity)`` arrays. Randomness comes from a NumPy generator, so a seed
+    reproduces a batch but not the episodes of the scalar core. Spawns keep the
+    scalar core's spacing but are never delayed by its fairness check, which
+    the default curve never needs.
+    """
+
+    def __init__(self, n: int, seed: int = None, capacity: int = 16, schedule: Schedule = None):
+        self.n = n
+        self.capacity = capacity
+        self.rng = np.random.default_rng(seed)
+
+        self.schedule = schedule if schedule is not None else DEFAULT_SCHEDULE
+        self.thresholds = np.array(self.schedule.thresholds, dtype=np.float64)
+        self.steps: dict = {}
+        for field in SCHEDULE_FIELDS:
+            column = self.schedule.column(field)
+            present = np.array([value is not None for value in column], dtype=bool)
+            if present.any():
+                values = np.array([value or 0 for value in column], dtype=np.float64)
+                self.steps[field] = (values, present)
+
+        self.dino_width = int(DINO_WIDTH)
+        self.dino_height = int(DINO_HEIGHT)
+        self.dino_x = float(200 * SCALE - self.dino_width // 2)
+
+        self.reset()
+
+    def reset(self):
+        n, k = self.n, self.capacity
+
+        self.tick = np.zeros(n, dtype=np.int64)
+        self.score = np.zeros(n, dtype=np.float64)
+        self.timer = np.zeros(n, dtype=np.int64)
+        self.timer_counter = np.zeros(n, dtype=np.int64)
+        self.died_at = np.full(n, -1, dtype=np.int64)
+
+        self.is_freeze = np.ones(n, dtype=bool)
+        self.freeze_left = np.full(n, FREEZE_SECONDS * TICK_RATE, dtype=np.int64)
+
+        self.bg_speed = np.zeros(n, dtype=np.float64)
+        self.gravity = np.full(n, GRAVITY * SCALE, dtype=np.float64)
+
+        self.generate_duration = np.full(n, GENERATE_DURATION, dtype=np.int64)
+        self.generate_counter = np.zeros(n, dtype=np.int64)
+        self.obstacle_speed = np.full(n, OBSTACLE_START_SPEED, dtype=np.float64)
+        self.helicopter_speed = np.full(n, HELICOPTER_START_SPEED, dtype=np.float64)
+        self.next_step = np.zeros(n, dtype=np.int64)
+
+        self.dino_y = np.full(n, GROUND_Y - TILE_SIZE - self.dino_height, dtype=np.float64)
+        self.dino_prev_y = self.dino_y.copy()
+        self.vel_y = np.zeros(n, dtype=np.float64)
+        self.on_ground = np.zeros(n, dtype=bool)
+        self.state = np.full(n, IDLE, dtype=np.int8)
+        self.alive = np.ones(n, dtype=bool)
+        self.jump_force = np.full(n, -12 * SCALE, dtype=np.float64)
+        self.down_timer = np.full(n, DINO_DOWN_TIMER, dtype=np.int64)
+        self.down_counter = np.zeros(n, dtype=np.int64)
+
+        self.obs_x = np.zeros((n, k), dtype=np.float64)
+        self.obs_prev_x = np.zeros((n, k), dtype=np.float64)
+        self.obs_y = np.zeros((n, k), dtype=np.float64)
+        self.obs_kind = np.zeros((n, k), dtype=np.int8)
+        # Sizes of the slots' kinds, set at spawn
+        self.obs_width = np.zeros((n, k), dtype=np.float64)
+        self.obs_height = np.zeros((n, k), dtype=np.float64)
+        self.obs_speed = np.zeros((n, k), dtype=np.float64)
+        self.obs_active = np.zeros((n, k), dtype=bool)
+
+    def apply_inputs(self, actions: np.ndarray):
+        jump = (actions & JUMP).astype(bool) & self.alive & self.on_ground & (self.state != IDLE)
+        self.state[jump] = JUMPING
+        self.vel_y[jump] = self.jump_force[jump]
+        self.on_ground[jump] = False
+
+        duck = (actions & DUCK).astype(bool) & self.alive & (self.state != IDLE) & (self.state != DOWN) & \
+            (self.state != JUMPING)
+        self.state[duck] = DOWN
+        self.down_counter[duck] = 0
+
+    def update_freeze(self):
+        freeze = self.is_freeze
+        self.freeze_left[freeze] -= 1
+        ended = freeze & (self.freeze_left <= 0)
+        self.is_freeze[ended] = False
+        self.bg_speed[ended] = BG_START_SPEED
+        self.state[ended & self.alive] = RUN
+
+    def generate_obstacles(self, playing: np.ndarray):
+        due = playing & (self.generate_counter > self.generate_duration)
+        self.generate_counter[due] = 0
+
+        free = ~self.obs_active
+        due &= free.any(axis=1)
+        games = np.flatnonzero(due)
+        if games.size:
+            slots = free[games].argmax(axis=1)
+            # Only games that spawn draw, like simulation.SpawnTimeline
+            helicopter = self.rng.integers(1, 11, games.size) >= 8
+
+            kind = self.rng.integers(0, len(OBSTACLE_NAMES), games.size)
+            kind[helicopter] = HELICOPTER
+            center = np.where(helicopter,
+                              self.rng.integers(WIDTH + 10, WIDTH + 21, games.size),
+                              self.rng.integers(WIDTH, WIDTH + 101, games.size))
+            bottom = np.where(helicopter, GROUND_Y - self.dino_height // 1.5, GROUND_Y + 5)
+
+            self.obs_kind[games, slots] = kind
+            self.obs_width[games, slots] = KIND_WIDTH[kind]
+            self.obs_height[games, slots] = KIND_HEIGHT[kind]
+            self.obs_x[games, slots] = center - KIND_WIDTH[kind] // 2
+            self.obs_y[games, slots] = bottom - KIND_HEIGHT[kind]
+            self.obs_prev_x[games, slots] = self.obs_x[games, slots]
+            self.obs_speed[games, slots] = np.where(helicopter, self.helicopter_speed[games],
+                                                    self.obstacle_speed[games])
+            self.obs_active[games, slots] = True
+
+        self.generate_counter[playing] += 1
+        self.timer_counter[playing] += 1
+        second = self.timer_counter >= TICK_RATE
+        self.timer_counter[second] = 0
+        self.timer[second] += 1
+
+    def update_obstacles(self):
+        self.obs_prev_x[:] = self.obs_x
+        moving = self.obs_active & self.alive[:, None]
+        width = self.obs_width
+        bg_speed = self.bg_speed[:, None]
+        helicopter = self.obs_kind == HELICOPTER
+
+        flying = moving & helicopter & (self.obs_x > -width)
+        self.obs_x -= np.where(flying, bg_speed + self.obs_speed, 0)
+        self.obs_active[moving & helicopter & ~flying] = False
+
+        ground = moving & ~helicopter
+        self.obs_x -= np.where(ground, bg_speed, 0)
+        self.obs_active[ground & (self.obs_x + 4 * width < 0)] = False
+        self.obs_x -= np.where(ground & KIND_ROTATES[self.obs_kind], self.obs_speed, 0)
+
+    def update_dino(self):
+        self.dino_prev_y[:] = self.dino_y
+        falling = ~self.on_ground
+        self.vel_y[falling] += self.gravity[falling]
+        dy = np.where(falling, self.vel_y, 0.0)
+
+        offset = self.dino_height // 7
+        bottom = self.dino_y + self.dino_height
+        landed = bottom + dy - offset > GROUND_Y
+        dy = np.where(landed, GROUND_Y - bottom + offset, dy)
+        self.on_ground |= landed
+        self.state[landed & self.alive & ~self.is_freeze] = RUN
+        self.dino_y += dy
+
+        down = self.alive & (self.state == DOWN)
+        self.down_counter[down] += 1
+        up = down & (self.down_counter > self.down_timer)
+        self.down_counter[up] = 0
+        self.state[up] = RUN
+
+    def collisions(self) -> np.ndarray:
+        # Same test as simulation.collides_swept: the windows of the tick during which the dino's x is
+        # inside the obstacle's span and its y inside the vertical bounds must overlap. Only live
+        # obstacles of games still alive are tested
+        hits = np.zeros((self.n, self.capacity), dtype=bool)
+        games, slots = np.nonzero(self.obs_active & self.alive[:, None])
+        if not games.size:
+            return hits
+
+        kind = self.obs_kind[games, slots]
+        helicopter = kind == HELICOPTER
+        y = self.obs_y[games, slots]
+        height = self.obs_height[games, slots]
+
+        x0, x1 = sweep(self.dino_x - self.obs_prev_x[games, slots], self.dino_x - self.obs_x[games, slots],
+                       KIND_SPAN_LOW[kind], KIND_SPAN_HIGH[kind])
+
+        duck = np.where(self.state[games] == DOWN, HELICOPTER_DUCK, 0)
+        low = np.where(helicopter, -np.inf, y - DINO_HITBOX[1] - DINO_HITBOX[3])
+        high = np.where(helicopter, y + height - HELICOPTER_HEAD - duck, y + height - DINO_HITBOX[1])
+        y0, y1 = sweep(self.dino_prev_y[games], self.dino_y[games], low, high)
+
+        hits[games, slots] = np.maximum(x0, y0) < np.minimum(x1, y1)
+        return hits
+
+    def collide_obstacles(self):
+        hits = self.collisions()
+        dead = hits.any(axis=1)
+        self.alive[dead] = False
+        self.state[dead] = DEAD
+        self.bg_speed[dead] = 0
+        self.died_at[dead] = self.tick[dead]
+        self.obs_speed[hits] = 0
+
+    def update_score(self):
+        scoring = ~self.is_freeze & self.alive
+        self.score[scoring] += 0.1 * 20
+        self.jump_force[scoring] = -12 * SCALE - 20
+        self.gravity[scoring] = 0.55 * SCALE + 2
+
+        # Same as simulation.update_score: each game compares its score with its own next threshold
+        due = scoring & (self.score >= self.thresholds[self.next_step])
+        while due.any():
+            games = np.flatnonzero(due)
+            steps = self.next_step[games]
+            for field, (values, present) in self.steps.items():
+                hit = present[steps]
+                getattr(self, field)[games[hit]] = values[steps[hit]]
+            self.next_step[games] += 1
+            due = scoring & (self.score >= self.thresholds[self.next_step])
+
+    def step(self, actions=NONE):
+        actions = np.broadcast_to(np.asarray(actions, dtype=np.int8), (self.n,))
+        self.tick += 1
+
+        self.apply_inputs(actions)
+        self.update_freeze()
+        self.generate_obstacles(self.alive & ~self.is_freeze)
+        self.update_obstacles()
+        self.update_dino()
+        self.collide_obstacles()
+        self.update_score()
+
+    def nearest_obstacle(self) -> tuple:
+        ahead = self.obs_active & (self.obs_x + self.obs_width > self.dino_x)
+        distance = np.where(ahead, self.obs_x - self.dino_x, np.inf)
+        index = distance.argmin(axis=1)
+        rows = np.arange(self.n)
+        return distance[rows, index], np.where(ahead[rows, index], self.obs_kind[rows, index], -1)
+
+    def run(self, policy=None, max_ticks: int = 60 * TICK_RATE) -> dict:
+        for _ in range(max_ticks):
+            if not self.alive.any():
+                break
+            self.step(policy(self) if policy else NONE)
+
+        return {
+            "score": self.score.copy(),
+            "ticks": np.where(self.died_at >= 0, self.died_at, self.tick),
+            "alive": self.alive.copy(),
+        }
+
+
+def reflex_policy(sim: BatchSimulation) -> np.ndarray:
+    # rollout.reflex_policy for a whole batch
+    distance, kind = sim.nearest_obstacle()
+    actions = np.where((kind >= 0) & (kind != HELICOPTER) & (distance < 12 * sim.bg_speed + 40), JUMP, NONE)
+    actions = np.where((kind == HELICOPTER) & (distance < 40 * sim.bg_speed), DUCK, actions)
+    return actions.astype(np.int8)
@@ -0,0 +1,248 @@
+import argparse
+import json
+import os
+import tempfile
+import time
+import tracemalloc
+
+from probes import percentile
+from settings import TICK_TIME
+
+SPEED_TIERS = range(4, 17)
+
+
+class Scenario:
+    """A scripted stretch of play: ``setup`` puts the game in shape, ``frame`` draws one frame."""
+
+    def __init__(self, name: str, game):
+        self.name = name
+        self.game = game
+
+    def setup(self):
+        pass
+
+    def frame(self, index: int):
+        pass
+
+
+class SceneScenario(Scenario):
+    def __init__(self, name: str, game, seed: int = 0):
+        super().__init__(name, game)
+        self.seed = seed
+        self.schedule = None
+
+    def setup(self):
+        self.scene = self.game.scene
+        self.scene.reset(self.seed, self.schedule)
+        self.scene.take_scr = False
+        self.state = self.scene.state
+
+    def play(self):
+        # Skip the countdown, keep the dino alive and let it jump like a player would
+        from rollout import reflex_policy
+
+        self.state.dino.immortal = True
+        self.state.freeze_left = 1
+
+        def frame(index: int):
+            self.scene.inputs = reflex_policy(self.state)
+            self.pin()
+            self.scene.frame(TICK_TIME)
+
+        return frame
+
+    def pin(self):
+        pass
+
+
+class IdleStartScreen(Scenario):
+    def setup(self):
+        import app
+
+        self.screen = self.game.start_screen = app.StartScreen(self.game)
+        self.screen.is_feed = False
+        self.screen.is_loaded = True
+
+    def frame(self, index: int):
+        self.screen.frame()
+
+
+class SteadyRun(SceneScenario):
+    def __init__(self, game, speed: int):
+        super().__init__(f"run_speed_{speed}", game)
+        self.speed = speed
+
+    def setup(self):
+        super().setup()
+        self.frame = self.play()
+
+    def pin(self):
+        self.state.bg_speed = self.speed if not self.state.is_freeze else 0
+
+
+class SpawnBurst(SceneScenario):
+    def setup(self):
+        # The default curve with obstacles spawning as often as they ever do from the start
+        from difficulty import Schedule
+        from simulation import DEFAULT_SCHEDULE, MIN_GENERATE_DURATION
+
+        steps = [(score, {field: value for field, value in changes if field != "generate_duration"})
+                 for score, changes in zip(DEFAULT_SCHEDULE.thresholds, DEFAULT_SCHEDULE.changes)]
+        self.schedule = Schedule(steps + [(0, {"generate_duration": MIN_GENERATE_DURATION})])
+        super().setup()
+        self.frame = self.play()
+
+
+class PauseConsole(SceneScenario):
+    TEXT = "alive 1"
+
+    def setup(self):
+        super().setup()
+        self.scene.is_pause = True
+        self.scene.pause_screen.console_active = True
+        self.scene.pause_screen.console.input_active = True
+
+    def frame(self, index: int):
+        # Type the cheat one key per frame, then delete it again
+        import pygame
+
+        count = len(self.TEXT)
+        position = index % (2 * count)
+        if position < count:
+            char = self.TEXT[position]
+            event = pygame.event.Event(pygame.KEYDOWN, key=ord(char), unicode=char, mod=0)
+        else:
+            event = pygame.event.Event(pygame.KEYDOWN, key=pygame.K_BACKSPACE, unicode="\b", mod=0)
+        pygame.event.post(event)
+        self.scene.frame(TICK_TIME)
+
+
+class FailSlideIn(SceneScenario):
+    def setup(self):
+        from settings import HEIGHT
+
+        super().setup()
+        self.top = -HEIGHT
+        self.kill()
+
+    def kill(self):
+        dino = self.state.dino
+        dino.alive = False
+        dino.state = "Dead"
+        self.state.is_freeze = False
+        self.state.bg_speed = 0
+        self.scene.fail_screen.rect.y = self.top
+        # The death frame hands a screenshot to the fail screen, like a real death
+        self.scene.take_scr = True
+
+    def frame(self, index: int):
+        from settings import HEIGHT
+
+        if self.scene.fail_screen.rect.bottom >= HEIGHT:
+            self.kill()
+        self.scene.frame(TICK_TIME)
+
+
+class Restart(SceneScenario):
+    # Every frame starts a new game, like pressing Restart on the fail screen, and draws its first frame
+    def setup(self):
+        super().setup()
+        self.resets: list = []
+
+    def frame(self, index: int):
+        self.scene.reset(self.seed + index)
+        self.resets.append(self.scene.reset_ms)
+        self.scene.frame(TICK_TIME)
+
+
+def scenarios(game) -> list:
+    return (
+        [IdleStartScreen("idle_start_screen", game)]
+        + [SteadyRun(game, speed) for speed in SPEED_TIERS]
+        + [SpawnBurst("spawn_burst", game), PauseConsole("pause_console", game), FailSlideIn("fail_slide_in", game),
+           Restart("restart", game)]
+    )
+
+
+def measure(scenario: Scenario, frames: int, warmup: int) -> dict:
+    scenario.setup()
+    for index in range(warmup):
+        scenario.frame(index)
+
+    latencies = []
+    for index in range(warmup, warmup + frames):
+        started = time.perf_counter()
+        scenario.frame(index)
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    # A second pass under tracemalloc, which slows frames down too much to time them
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    peaks = []
+    for index in range(warmup + frames, warmup + 2 * frames):
+        tracemalloc.reset_peak()
+        current = tracemalloc.get_traced_memory()[0]
+        scenario.frame(index)
+        peaks.append(tracemalloc.get_traced_memory()[1] - current)
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+
+    growth = after.compare_to(before, "filename")
+    result = {
+        "frames": frames,
+        "fps": frames / (sum(latencies) / 1000),
+        "p50_ms": percentile(latencies, 0.50),
+        "p95_ms": percentile(latencies, 0.95),
+        "p99_ms": percentile(latencies, 0.99),
+        "max_ms": max(latencies),
+        "blocks_per_frame": sum(stat.count_diff for stat in growth) / frames,
+        "bytes_per_frame": sum(stat.size_diff for stat in growth) / frames,
+        "peak_kb_per_frame": sum(peaks) / len(peaks) / 1024,
+    }
+    if isinstance(scenario, Restart):
+        # Timed pass only, tracemalloc inflates the rest
+        resets = scenario.resets[warmup:warmup + frames]
+        result["reset_p50_ms"] = percentile(resets, 0.50)
+        result["reset_max_ms"] = max(resets)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run scripted game scenarios headlessly and report frame costs")
+    parser.add_argument("--frames", type=int, default=600)
+    parser.add_argument("--warmup", type=int, default=60)
+    parser.add_argument("--only", nargs="*", help="scenario names to run (default: all)")
+    parser.add_argument("--json", help="also write the results to this file")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    import app
+    from capture import screenshots
+
+    # Keep the benchmark's screenshots out of the game's folder
+    screenshots.directory = tempfile.mkdtemp(prefix="dino-bench-")
+    game = app.Game(seed=0)
+
+    results = {}
+    print(f"{'scenario':<20}{'fps':>9}{'p50':>8}{'p95':>8}{'p99':>8}{'max':>8}{'blocks/f':>10}{'peak KB/f':>11}")
+    for scenario in scenarios(game):
+        if args.only and scenario.name not in args.only:
+            continue
+        result = results[scenario.name] = measure(scenario, args.frames, args.warmup)
+        print(f"{scenario.name:<20}{result['fps']:>9.0f}{result['p50_ms']:>8.2f}{result['p95_ms']:>8.2f}"
+              f"{result['p99_ms']:>8.2f}{result['max_ms']:>8.2f}{result['blocks_per_frame']:>10.2f}"
+              f"{result['peak_kb_per_frame']:>11.1f}")
+        if "reset_max_ms" in result:
+            print(f"{'':<20}reset alone p50 {result['reset_p50_ms']:.3f} ms, max {result['reset_max_ms']:.3f} ms")
+
+    screenshots.flush()
+    pygame.quit()
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(results, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
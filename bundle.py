@@ -0,0 +1,50 @@
+import argparse
+import os
+import time
+
+from settings import ASSET_BUNDLE
+
+
+def warm_up(game):
+    # Obstacles and helicopters load their frames on first spawn, build them now so they get baked too
+    import app
+    from settings import GROUND_Y
+    from simulation import GameState, ObstacleBody, OBSTACLE_NAMES
+
+    state = GameState(0)
+    for serial, kind in enumerate(OBSTACLE_NAMES + ("Helicopter",)):
+        body = ObstacleBody(kind, 0, GROUND_Y, state.obstacle_speed, state.obstacle_anim_speed, serial)
+        (app.Helicopter if body.is_helicopter else app.Obstacle)(game.scene, body)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bake the scaled and converted assets into one memory-mappable file")
+    parser.add_argument("--output", default=ASSET_BUNDLE)
+    parser.add_argument("--alpha-report", action="store_true",
+                        help="list the surfaces kept with per-pixel alpha although none of their pixels is translucent")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    import app
+    from resources import assets
+
+    started = time.perf_counter()
+    game = app.Game(bundle=None)
+    warm_up(game)
+    count = assets.save_bundle(args.output)
+    elapsed = time.perf_counter() - started
+    report = assets.alpha_report()
+    pygame.quit()
+
+    print(f"baked {count} surfaces into {args.output} "
+          f"({os.path.getsize(args.output) / 2 ** 20:.1f} MB) in {elapsed:.2f}s")
+    print(f"{len(report['needs_alpha'])} surfaces need per-pixel alpha, {len(report['opaque'])} are fully opaque")
+    if args.alpha_report:
+        for key in report["opaque"]:
+            print(f"  opaque: {key}")
+
+
+if __name__ == '__main__':
+    main()
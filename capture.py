@@ -0,0 +1,71 @@
+import os
+import queue
+import threading
+
+import pygame
+
+
+class ScreenshotWriter:
+    """Saves screenshots to numbered PNG files on a background thread.
+
+    ``save`` copies the surface and hands the copy to the writer thread, so the
+    frame that asked for it only pays for the copy, not the PNG encode and the
+    disk write. File numbers come from a counter that is seeded from the
+    directory once, instead of listing the directory for every candidate name.
+    """
+
+    def __init__(self, directory: str = "screenshots"):
+        self.directory = directory
+        self.queue: queue.Queue = queue.Queue()
+        self.thread: threading.Thread = None
+        self.next_number: int = None
+
+        self.saved: int = 0
+
+    def allocate(self) -> str:
+        if self.next_number is None:
+            os.makedirs(self.directory, exist_ok=True)
+            numbers = [int(name[:-4]) for name in os.listdir(self.directory)
+                       if name.endswith(".png") and name[:-4].isdigit()]
+            self.next_number = max(numbers, default=0) + 1
+
+        path = f"{self.directory}/{self.next_number}.png"
+        self.next_number += 1
+        return path
+
+    def save(self, surface: pygame.Surface) -> pygame.Surface:
+        image = surface.copy()
+        self.queue.put((image, self.allocate()))
+
+        if self.thread is None:
+            self.thread = threading.Thread(target=self.work, name="screenshot-writer", daemon=True)
+            self.thread.start()
+        return image
+
+    def work(self):
+        while True:
+            image, path = self.queue.get()
+            try:
+                pygame.image.save(image, path)
+                self.saved += 1
+            except (pygame.error, OSError) as e:
+                print(f"screenshot {path} failed: {e}")
+            finally:
+                self.queue.task_done()
+
+    def flush(self):
+        self.queue.join()
+
+    def reset(self):
+        # The directory was emptied, numbering starts again from 1
+        self.flush()
+        self.next_number = None
+
+    def stats(self) -> dict:
+        return {
+            "saved": self.saved,
+            "pending": self.queue.unfinished_tasks,
+        }
+
+
+screenshots = ScreenshotWriter()
@@ -0,0 +1,104 @@
+import argparse
+import json
+import math
+
+# Values a step can set, named after the GameState attributes they land on (down_timer is the dino's)
+FIELDS = (
+    "bg_speed", "down_timer", "generate_duration",
+    "obstacle_speed", "helicopter_speed", "obstacle_anim_speed", "dino_anim_speed",
+)
+
+
+def ramp(field: str, start: int, every: int, by: int, limit: int) -> list:
+    # Steps moving field from start by `by` every `every` points until it reaches limit
+    steps = []
+    value = start
+    score = every
+    while value != limit:
+        value = min(value + by, limit) if by > 0 else max(value + by, limit)
+        steps.append((score, {field: value}))
+        score += every
+    return steps
+
+
+class Schedule:
+    """A difficulty curve: score thresholds, each with the values that take effect once the score
+    reaches it.
+
+    ``thresholds`` is sorted and ends with infinity, so a game keeps the index of its next step and
+    only compares its score with that one threshold per tick. Every step fires exactly once, on the
+    tick the score reaches it. Files are JSON: ``{"steps": [{"score": 100, "bg_speed": 5}, ...]}``.
+    """
+
+    def __init__(self, steps):
+        merged = {}
+        for score, changes in steps:
+            unknown = set(changes) - set(FIELDS)
+            if unknown:
+                raise ValueError(f"unknown difficulty fields {sorted(unknown)}, expected some of {FIELDS}")
+            merged.setdefault(score, {}).update(changes)
+
+        self.thresholds: list = sorted(merged) + [math.inf]
+        self.changes: list = [tuple(merged[score].items()) for score in self.thresholds[:-1]]
+
+    def __len__(self) -> int:
+        return len(self.changes)
+
+    def column(self, field: str) -> list:
+        # The value each step sets field to, None where it leaves it alone
+        return [dict(changes).get(field) for changes in self.changes]
+
+    def to_dict(self) -> dict:
+        return {"steps": [dict(score=score, **dict(changes)) for score, changes in zip(self.thresholds, self.changes)]}
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "Schedule":
+        steps = []
+        for step in data["steps"]:
+            step = dict(step)
+            steps.append((step.pop("score"), step))
+        return cls(steps)
+
+    def save(self, path: str):
+        with open(path, "w") as file:
+            json.dump(self.to_dict(), file, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> "Schedule":
+        with open(path) as file:
+            return cls.from_dict(json.load(file))
+
+
+def load_schedule(name: str) -> Schedule:
+    if name == "default":
+        from simulation import DEFAULT_SCHEDULE
+        return DEFAULT_SCHEDULE
+    return Schedule.load(name)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare difficulty curves over batches of simulated games")
+    parser.add_argument("curves", nargs="*", help="curve files, or 'default' for the built-in curve")
+    parser.add_argument("--dump", help="write the built-in curve to this file and exit")
+    parser.add_argument("--games", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=20000)
+    args = parser.parse_args()
+
+    if args.dump:
+        load_schedule("default").save(args.dump)
+        return
+
+    from batch import BatchSimulation, reflex_policy
+
+    print(f"{'curve':<24}{'steps':>6}{'score mean':>12}{'p50':>9}{'max':>9}{'survived':>10}")
+    for name in args.curves or ["default"]:
+        schedule = load_schedule(name)
+        result = BatchSimulation(args.games, args.seed, schedule=schedule).run(reflex_policy, args.max_ticks)
+        score = result["score"]
+        print(f"{name:<24}{len(schedule):>6}{score.mean():>12.1f}{float(sorted(score)[len(score) // 2]):>9.0f}"
+              f"{score.max():>9.0f}{result['alive'].mean():>10.1%}")
+
+
+if __name__ == '__main__':
+    main()
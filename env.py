@@ -0,0 +1,132 @@
+import os
+
+import numpy as np
+
+import simulation
+from settings import WIDTH, HEIGHT, TICK_RATE
+from simulation import GameState, NONE, JUMP, DUCK, BG_MAX_SPEED
+
+OBS_MODES = ("features", "pixels", "both")
+NEAREST_OBSTACLES = 2
+FEATURE_SIZE = 5 + 5 * NEAREST_OBSTACLES
+GRAY_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+class DinoEnv:
+    """Gym-style wrapper around the simulation core.
+
+    ``reset(seed)`` returns ``(obs, info)`` and ``step(action)`` returns
+    ``(obs, reward, terminated, truncated, info)``. Actions are the indices of
+    ``ACTIONS``: nothing, jump, duck. The reward is the score gained during the
+    step. Pixel observations render the real Scene on SDL's dummy driver and
+    are only set up when an observation mode asks for them.
+    """
+
+    ACTIONS = (NONE, JUMP, DUCK)
+
+    def __init__(self, obs_mode: str = "features", frame_skip: int = 1, frame_size: tuple = (100, 60),
+                 max_ticks: int = 300 * TICK_RATE):
+        if obs_mode not in OBS_MODES:
+            raise ValueError(f"obs_mode must be one of {OBS_MODES}, got {obs_mode!r}")
+        if frame_skip < 1:
+            raise ValueError("frame_skip must be at least 1")
+
+        self.obs_mode = obs_mode
+        self.frame_skip = frame_skip
+        self.frame_size = frame_size
+        self.max_ticks = max_ticks
+
+        self.state: GameState = None
+        self.scene = None
+        if obs_mode != "features":
+            self.scene = self.make_scene()
+
+    @staticmethod
+    def make_scene():
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+        import app
+
+        return app.Game().scene
+
+    def reset(self, seed: int = None) -> tuple:
+        if self.scene is not None:
+            # Also rewinds the sprites' animations, so an episode's frames only depend on its seed
+            self.scene.reset(seed)
+            self.state = self.scene.state
+        else:
+            self.state = GameState(seed)
+        return self.observe(), self.info()
+
+    def step(self, action: int) -> tuple:
+        inputs = self.ACTIONS[action]
+        score = self.state.score
+
+        for _ in range(self.frame_skip):
+            if self.scene is not None:
+                self.scene.inputs = inputs
+                self.scene.advance()
+            else:
+                simulation.step(self.state, inputs)
+            if not self.state.dino.alive:
+                break
+
+        terminated = not self.state.dino.alive
+        truncated = not terminated and self.state.tick >= self.max_ticks
+        return self.observe(), self.state.score - score, terminated, truncated, self.info()
+
+    def info(self) -> dict:
+        return {"tick": self.state.tick, "score": self.state.score, "timer": self.state.timer}
+
+    def observe(self):
+        if self.obs_mode == "features":
+            return self.features()
+        if self.obs_mode == "pixels":
+            return self.frame()
+        return {"features": self.features(), "frame": self.frame()}
+
+    def features(self) -> np.ndarray:
+        state = self.state
+        dino = state.dino
+        obs = np.zeros(FEATURE_SIZE, dtype=np.float32)
+        obs[:5] = (
+            dino.y / HEIGHT,
+            dino.vel_y / abs(dino.jump_force),
+            dino.on_ground,
+            dino.state == "Down",
+            state.bg_speed / BG_MAX_SPEED,
+        )
+
+        ahead = sorted((body for body in state.obstacle_list if body.x + body.width > dino.x), key=lambda b: b.x)
+        for index in range(NEAREST_OBSTACLES):
+            start = 5 + 5 * index
+            if index < len(ahead):
+                body = ahead[index]
+                obs[start:start + 5] = (
+                    (body.x - dino.x) / WIDTH,
+                    body.y / HEIGHT,
+                    body.width / WIDTH,
+                    body.height / HEIGHT,
+                    body.is_helicopter,
+                )
+            else:
+                obs[start] = 1.0
+
+        return obs
+
+    def frame(self) -> np.ndarray:
+        import pygame
+
+        self.scene.draw_world()
+        frame = pygame.transform.smoothscale(self.scene.window, self.frame_size)
+        pixels = pygame.surfarray.pixels3d(frame)
+        gray = (pixels @ GRAY_WEIGHTS).astype(np.uint8).T
+        del pixels
+        return gray
+
+    def close(self):
+        if self.scene is not None:
+            import pygame
+
+            pygame.quit()
+            self.scene = None
@@ -0,0 +1,48 @@
+class EntityPool:
+    def __init__(self):
+        self.live: list = []
+        self.free: dict = {}
+        self.allocated: int = 0
+
+    def spawn(self, kind, *args):
+        free = self.free.get(kind)
+        if free:
+            entity = free.pop()
+            entity.reset(*args)
+        else:
+            entity = kind(*args)
+            self.allocated += 1
+
+        self.live.append(entity)
+        return entity
+
+    def release(self, entity):
+        self.free.setdefault(type(entity), []).append(entity)
+
+    def prune(self):
+        active = []
+        for entity in self.live:
+            if entity.is_active:
+                active.append(entity)
+            else:
+                self.release(entity)
+
+        if len(active) != len(self.live):
+            # Slice assignment keeps the list object shared with Scene.obstacle_list
+            self.live[:] = active
+
+    def clear(self):
+        for entity in self.live:
+            self.release(entity)
+        self.live.clear()
+
+    @property
+    def pooled(self) -> int:
+        return sum(len(free) for free in self.free.values())
+
+    def stats(self) -> dict:
+        return {
+            "live": len(self.live),
+            "pooled": self.pooled,
+            "allocated": self.allocated,
+        }
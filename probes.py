@@ -0,0 +1,150 @@
+import csv
+import json
+import os
+from array import array
+from time import perf_counter
+
+import pygame
+
+from resources import assets
+
+PROBES = (
+    "simulation", "obstacle_update", "dino_update",
+    "background", "obstacle_draw", "dino_draw",
+    "hud", "overlays", "events", "display",
+)
+COLORS = (
+    "gray60", "orange", "gold",
+    "steelblue", "tomato", "limegreen",
+    "violet", "cyan", "white", "red",
+)
+GRAPH_SIZE = (240, 100)
+GRAPH_MS = 1000 / 30
+STATS_EVERY = 30
+
+
+def percentile(values, fraction: float) -> float:
+    values = sorted(values)
+    if not values:
+        return 0.0
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+class FrameProbes:
+    """Splits each frame's time between named subsystems.
+
+    Call ``lap(name)`` right after a subsystem ran: the time since the
+    previous lap is added to ``name`` for the current frame, and ``frame()``
+    closes the frame. While disabled ``lap`` is swapped for an empty method,
+    so a probe left in the code costs one call.
+    """
+
+    def __init__(self, names: tuple = PROBES, window: int = GRAPH_SIZE[0]):
+        self.names = names
+        self.index = {name: i for i, name in enumerate(names)}
+        self.window = window
+
+        # Milliseconds per frame and probe, for the whole session
+        self.samples = [array("d") for _ in names]
+        self.current = [0.0] * len(names)
+        self.pending = False
+        self.last = 0.0
+        self.frames = 0
+
+        self.enabled = False
+        self.visible = False
+        self.lap = self.skip
+
+        self.graph: pygame.Surface = None
+        self.lines: list = []
+
+    def enable(self, enabled: bool = True):
+        self.enabled = enabled
+        self.lap = self.record if enabled else self.skip
+        self.last = perf_counter()
+
+    def skip(self, name: str):
+        pass
+
+    def record(self, name: str):
+        now = perf_counter()
+        self.current[self.index[name]] += now - self.last
+        self.last = now
+        self.pending = True
+
+    def frame(self):
+        if not self.enabled:
+            return
+        if self.pending:
+            for samples, value in zip(self.samples, self.current):
+                samples.append(value * 1000)
+            self.frames += 1
+            if self.visible:
+                self.plot()
+            self.current = [0.0] * len(self.names)
+            self.pending = False
+        self.last = perf_counter()
+
+    def plot(self):
+        width, height = GRAPH_SIZE
+        if self.graph is None:
+            self.graph = pygame.Surface(GRAPH_SIZE)
+            self.graph.fill("black")
+
+        self.graph.scroll(-1, 0)
+        self.graph.fill("black", (width - 1, 0, 1, height))
+        y = height
+        for samples, color in zip(self.samples, COLORS):
+            top = y - samples[-1] * height / GRAPH_MS
+            pygame.draw.line(self.graph, color, (width - 1, y), (width - 1, top))
+            y = top
+
+        if self.frames % STATS_EVERY == 0 or not self.lines:
+            self.lines = self.render_stats()
+
+    def stats(self, last: int = None) -> dict:
+        stats = {}
+        for name, samples in zip(self.names, self.samples):
+            values = samples[-last:] if last else samples
+            stats[name] = {
+                "p50": percentile(values, 0.50),
+                "p95": percentile(values, 0.95),
+                "p99": percentile(values, 0.99),
+                "mean": sum(values) / len(values) if values else 0.0,
+                "max": max(values, default=0.0),
+            }
+        return stats
+
+    def render_stats(self) -> list:
+        font = assets.font("monospace", 14)
+        lines = [font.render("probe          p50    p95    p99 ms", True, "white")]
+        for (name, stat), color in zip(self.stats(self.window).items(), COLORS):
+            text = f"{name:<14}{stat['p50']:>6.2f} {stat['p95']:>6.2f} {stat['p99']:>6.2f}"
+            lines.append(font.render(text, True, color))
+        return lines
+
+    def draw(self, window: pygame.Surface, x: int = 10, y: int = 170) -> pygame.Rect:
+        if not self.visible or self.graph is None:
+            return None
+
+        rect = window.blit(self.graph, (x, y))
+        budget = y + GRAPH_SIZE[1] - GRAPH_SIZE[1] * 1000 / 60 / GRAPH_MS
+        pygame.draw.line(window, "red", (x, budget), (x + GRAPH_SIZE[0], budget))
+        for line in self.lines:
+            rect.union_ip(window.blit(line, (x, rect.bottom + 2)))
+        return rect
+
+    def export(self, path: str):
+        """Writes every frame to ``path``.csv and the percentiles to ``path``.json."""
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(f"{path}.csv", "w", newline="") as file:
+            writer = csv.writer(file)
+            writer.writerow(("frame",) + self.names)
+            for frame, row in enumerate(zip(*self.samples)):
+                writer.writerow((frame,) + tuple(f"{value:.4f}" for value in row))
+
+        with open(f"{path}.json", "w") as file:
+            json.dump({"frames": self.frames, "probes": self.stats()}, file, indent=2)
+
+
+probes = FrameProbes()
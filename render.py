@@ -0,0 +1,72 @@
+import pygame
+
+
+class DirtyRenderer:
+    """Pushes only the changed parts of the window while the world stands still.
+
+    While the background scrolls every pixel changes, so frames are drawn and
+    flipped in full. Once it stops (freeze countdown, pause, death) the
+    background layer is captured once; each following frame restores last
+    frame's dirty rects from that capture, redraws the sprites, HUD and
+    overlays on top, and passes only the old and new rects to
+    ``pygame.display.update``.
+    """
+
+    def __init__(self, window: pygame.Surface):
+        self.window = window
+        self.screen_rect = window.get_rect()
+        self.area = self.screen_rect.width * self.screen_rect.height
+
+        self.background: pygame.Surface = None
+        self.full = True
+        self.dirty: list = []
+        self.prev_dirty: list = []
+
+        self.frames = 0
+        self.pushed = 0
+        self.fraction = 1.0
+
+    def begin(self, static: bool) -> bool:
+        self.dirty = []
+        self.full = not static or self.background is None
+        if not static:
+            self.background = None
+        return self.full
+
+    def reset(self):
+        self.background = None
+        self.full = True
+        self.dirty = []
+        self.prev_dirty = []
+
+    def capture(self):
+        self.background = self.window.copy()
+
+    def restore(self):
+        for rect in self.prev_dirty:
+            self.window.blit(self.background, rect, rect)
+
+    def mark(self, rect: pygame.Rect):
+        if rect:
+            self.dirty.append(self.screen_rect.clip(rect))
+
+    def present(self):
+        if self.full:
+            pygame.display.update()
+            pushed = self.area
+        else:
+            rects = self.prev_dirty + self.dirty
+            pygame.display.update(rects)
+            pushed = min(sum(rect.width * rect.height for rect in rects), self.area)
+
+        self.prev_dirty = self.dirty
+        self.frames += 1
+        self.pushed += pushed
+        self.fraction = pushed / self.area
+
+    def stats(self) -> dict:
+        return {
+            "frames": self.frames,
+            "last_fraction": self.fraction,
+            "mean_fraction": self.pushed / (self.frames * self.area) if self.frames else 0.0,
+        }
@@ -0,0 +1,135 @@
+import argparse
+import os
+import sys
+import time
+
+import simulation
+from simulation import GameState
+
+LOG_HEADER = "# dino input log 2"
+
+
+class InputLog:
+    """Everything needed to reproduce a run: the seed, the inputs of every tick that had any, and
+    cheat toggles from the console.
+
+    Saved as text, one event per line: ``<tick> <inputs>`` or ``<tick> immortal <0|1>``, where
+    ``tick`` is the tick the event applies to. The header also keeps the final tick and score the
+    replay must reach.
+    """
+
+    def __init__(self, seed: int, pixel_collision: bool = False):
+        self.seed = seed
+        self.pixel_collision = pixel_collision
+        self.events: list = []
+        self.ticks = 0
+        self.score = 0.0
+
+    def record(self, tick: int, inputs: int):
+        self.events.append((tick, inputs))
+
+    def cheat(self, tick: int, immortal: bool):
+        self.events.append((tick, "immortal", int(immortal)))
+
+    def finish(self, state: GameState):
+        self.ticks = state.tick
+        self.score = state.score
+
+    def save(self, path: str):
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        lines = [
+            LOG_HEADER,
+            f"seed {self.seed}",
+            f"pixel_collision {int(self.pixel_collision)}",
+            f"ticks {self.ticks}",
+            f"score {self.score!r}",
+        ]
+        lines += [" ".join(str(field) for field in event) for event in self.events]
+        with open(path, "w") as file:
+            file.write("\n".join(lines) + "\n")
+
+    @classmethod
+    def load(cls, path: str) -> "InputLog":
+        with open(path) as file:
+            lines = file.read().split("\n")
+        if lines[0] != LOG_HEADER:
+            # Logs from before the spawn timeline lay out other obstacles from the same seed
+            raise ValueError(f"{path} is not an input log of this version")
+
+        header = dict(line.split(" ", 1) for line in lines[1:5])
+        log = cls(int(header["seed"]), header["pixel_collision"] == "1")
+        log.ticks = int(header["ticks"])
+        log.score = float(header["score"])
+
+        for line in lines[5:]:
+            if not line:
+                continue
+            fields = line.split(" ")
+            if len(fields) == 3:
+                log.cheat(int(fields[0]), fields[2] == "1")
+            else:
+                log.record(int(fields[0]), int(fields[1]))
+        return log
+
+
+def replay(log: InputLog, scene=None) -> GameState:
+    """Plays the log back as fast as possible, through the Scene when one is given."""
+    if scene is not None:
+        scene.reset(log.seed, pixel_collision=log.pixel_collision)
+        state = scene.state
+    elif log.pixel_collision:
+        raise ValueError("a log recorded with pixel collision can only be replayed through a Scene")
+    else:
+        state = GameState(log.seed)
+
+    events = iter(log.events)
+    event = next(events, None)
+    while state.tick < log.ticks:
+        tick = state.tick + 1
+        inputs = simulation.NONE
+        while event is not None and event[0] == tick:
+            if len(event) == 3:
+                state.dino.immortal = event[2] == 1
+            else:
+                inputs |= event[1]
+            event = next(events, None)
+
+        if scene is not None:
+            scene.inputs = inputs
+            scene.advance()
+        else:
+            simulation.step(state, inputs)
+
+    return state
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay input logs headlessly and check their final score")
+    parser.add_argument("logs", nargs="+")
+    parser.add_argument("--render", action="store_true",
+                        help="step the game Scene on SDL's dummy driver instead of the bare simulation")
+    args = parser.parse_args()
+
+    logs = [InputLog.load(path) for path in args.logs]
+    scene = None
+    if args.render or any(log.pixel_collision for log in logs):
+        # Pixel-perfect collisions depend on the frames the sprites show
+        from env import DinoEnv
+        scene = DinoEnv.make_scene()
+
+    failed = 0
+    for path, log in zip(args.logs, logs):
+        started = time.perf_counter()
+        state = replay(log, scene)
+        elapsed = time.perf_counter() - started
+
+        ok = state.score == log.score
+        failed += not ok
+        print(f"{path}: {'ok' if ok else 'MISMATCH'} score {state.score} (recorded {log.score}), "
+              f"{state.tick} ticks in {elapsed:.3f}s ({state.tick / max(elapsed, 1e-9):.0f} ticks/s)")
+
+    sys.exit(1 if failed else 0)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,290 @@
+import json
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+
+import pygame
+from pygame.font import SysFont
+from pygame.image import load
+from pygame.transform import scale
+
+from settings import WIN_SCALE, SCALE
+
+BUNDLE_MAGIC = b"DINOBNDL"
+BUNDLE_ALIGN = 64
+
+
+def aligned(offset: int) -> int:
+    return -(-offset // BUNDLE_ALIGN) * BUNDLE_ALIGN
+
+
+def as_key(value):
+    # JSON turns the tuples of a cache key into lists
+    if isinstance(value, list):
+        return tuple(as_key(item) for item in value)
+    return value
+
+
+def bundle_meta() -> dict:
+    return {
+        "win_scale": WIN_SCALE,
+        "scale": SCALE,
+        "masks": list(pygame.display.get_surface().get_masks()),
+    }
+
+
+class AssetCache:
+    def __init__(self):
+        self.surfaces: dict = {}
+        self.listings: dict = {}
+        self.fonts: dict = {}
+        self.masks: dict = {}
+        self.translucent: dict = {}
+        # Keys handed out to callers, as opposed to intermediate steps such as unscaled originals
+        self.requested: set = set()
+        self.bundle: mmap.mmap = None
+
+        self.hits: int = 0
+        self.misses: int = 0
+        self.disk_loads: int = 0
+        self.bundled: int = 0
+
+    def image(self, path: str, size: tuple = None, flip: tuple = (False, False), angle: int = 0,
+              alpha: bool = True) -> pygame.Surface:
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+        flip = tuple(flip)
+        self.requested.add((path, size, flip, angle, alpha))
+        return self.variant(path, size, flip, angle, alpha)
+
+    def variant(self, path: str, size: tuple, flip: tuple, angle: int, alpha: bool) -> pygame.Surface:
+        key = (path, size, flip, angle, alpha)
+
+        image = self.surfaces.get(key)
+        if image is not None:
+            self.hits += 1
+            return image
+
+        self.misses += 1
+        if not alpha:
+            image = self.variant(path, size, flip, angle, True).convert()
+        elif angle:
+            image = pygame.transform.rotate(self.variant(path, size, flip, 0, True), angle)
+        elif any(flip):
+            image = pygame.transform.flip(self.variant(path, size, (False, False), 0, True), *flip)
+        elif size is not None:
+            image = scale(self.variant(path, None, (False, False), 0, True), size)
+        else:
+            self.disk_loads += 1
+            image = load(path).convert_alpha()
+
+        self.surfaces[key] = image
+        return image
+
+    def get(self, key: tuple, build):
+        # Memoizes surfaces composed from other assets, e.g. the pre-rendered ground strip
+        self.requested.add(key)
+        value = self.surfaces.get(key)
+        if value is not None:
+            self.hits += 1
+            return value
+
+        self.misses += 1
+        value = self.surfaces[key] = build()
+        return value
+
+    def font(self, name: str, size: int, bold: bool = False) -> pygame.font.Font:
+        # SysFont scans the system font list on first use, later scenes reuse the same Font objects
+        key = (name, int(size), bold)
+        font = self.fonts.get(key)
+        if font is None:
+            font = self.fonts[key] = SysFont(name, int(size), bold)
+        return font
+
+    def mask(self, surface: pygame.Surface) -> pygame.mask.Mask:
+        # Keyed by the cached surface itself, every variant of an asset gets its own mask
+        mask = self.masks.get(surface)
+        if mask is None:
+            mask = self.masks[surface] = pygame.mask.from_surface(surface)
+        return mask
+
+    def needs_alpha(self, surface: pygame.Surface) -> bool:
+        # Whether any pixel is less than fully opaque, checked once per surface
+        translucent = self.translucent.get(surface)
+        if translucent is None:
+            if surface.get_flags() & pygame.SRCALPHA:
+                opaque = pygame.mask.from_surface(surface, 254).count()
+                translucent = opaque < surface.get_width() * surface.get_height()
+            else:
+                translucent = False
+            self.translucent[surface] = translucent
+        return translucent
+
+    def opaque(self, path: str, size: tuple = None, backdrop="white") -> pygame.Surface:
+        """The image as a surface without per-pixel alpha, which blits as a plain copy.
+
+        An image with translucent pixels is flattened onto ``backdrop`` first,
+        so drawing it looks like filling with ``backdrop`` and blitting the
+        original on top.
+        """
+        if size is not None:
+            size = (int(size[0]), int(size[1]))
+
+        def build() -> pygame.Surface:
+            image = self.variant(path, size, (False, False), 0, True)
+            if not self.needs_alpha(image):
+                return self.variant(path, size, (False, False), 0, False)
+            flat = pygame.Surface(image.get_size()).convert()
+            flat.fill(backdrop)
+            flat.blit(image, (0, 0))
+            return flat
+
+        return self.get((path, size, "opaque", backdrop), build)
+
+    def alpha_report(self) -> dict:
+        # Requested per-pixel alpha surfaces, split by whether they have any translucent pixel
+        report = {"needs_alpha": [], "opaque": []}
+        for key in sorted(self.requested, key=repr):
+            surface = self.surfaces.get(key)
+            if isinstance(surface, pygame.Surface) and surface.get_flags() & pygame.SRCALPHA:
+                report["needs_alpha" if self.needs_alpha(surface) else "opaque"].append(key)
+        return report
+
+    def listdir(self, path: str) -> tuple:
+        listing = self.listings.get(path)
+        if listing is None:
+            self.disk_loads += 1
+            listing = self.listings[path] = tuple(os.listdir(path))
+        return listing
+
+    def save_bundle(self, path: str) -> int:
+        """Writes every requested surface as raw BGRA pixels after a JSON index.
+
+        Only 32-bit surfaces whose transparency is per-pixel (or absent) are
+        stored; anything else is rebuilt from the PNGs as usual.
+        """
+        entries, blocks, sources = [], [], set()
+        offset = 0
+        for key in sorted(self.requested, key=repr):
+            surface = self.surfaces.get(key)
+            if surface is None or surface.get_bitsize() != 32:
+                continue
+            alpha = bool(surface.get_flags() & pygame.SRCALPHA)
+            if not alpha and (surface.get_colorkey() is not None or surface.get_alpha() is not None):
+                continue
+
+            data = pygame.image.tobytes(surface, "BGRA")
+            entries.append({"key": key, "size": surface.get_size(), "alpha": alpha, "offset": offset})
+            blocks.append(data)
+            offset = aligned(offset + len(data))
+            if isinstance(key[0], str) and os.path.isfile(key[0]):
+                sources.add(key[0])
+
+        meta = dict(bundle_meta(), built=time.time(), sources=sorted(sources))
+        index = json.dumps({"meta": meta, "entries": entries}).encode()
+        header = BUNDLE_MAGIC + struct.pack("<Q", len(index)) + index
+
+        with open(path, "wb") as file:
+            file.write(header.ljust(aligned(len(header)), b"\0"))
+            for data in blocks:
+                file.write(data.ljust(aligned(len(data)), b"\0"))
+        return len(entries)
+
+    def load_bundle(self, path: str) -> int:
+        """Maps a bundle written by save_bundle and serves its surfaces straight from the mapping.
+
+        Returns the number of surfaces loaded, 0 when the bundle is missing,
+        was baked for another scale or pixel format, or is older than one of
+        its source images.
+        """
+        if not os.path.isfile(path):
+            return 0
+        with open(path, "rb") as file:
+            if file.read(len(BUNDLE_MAGIC)) != BUNDLE_MAGIC:
+                return 0
+            # Copy-on-write, so a stray draw onto a bundled surface never reaches the file
+            bundle = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_COPY)
+
+        start = len(BUNDLE_MAGIC) + 8
+        (length,) = struct.unpack_from("<Q", bundle, len(BUNDLE_MAGIC))
+        index = json.loads(bundle[start:start + length])
+        meta = index["meta"]
+        if any(meta.get(name) != value for name, value in bundle_meta().items()):
+            return 0
+        if any(not os.path.isfile(source) or os.path.getmtime(source) > meta["built"] for source in meta["sources"]):
+            return 0
+
+        view = memoryview(bundle)
+        start = aligned(start + length)
+        for entry in index["entries"]:
+            width, height = entry["size"]
+            begin = start + entry["offset"]
+            surface = pygame.image.frombuffer(view[begin:begin + width * height * 4], (width, height), "BGRA")
+            if not entry["alpha"]:
+                surface = surface.convert()
+            self.surfaces[as_key(entry["key"])] = surface
+
+        self.bundle = bundle
+        self.bundled = len(index["entries"])
+        return self.bundled
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "disk_loads": self.disk_loads,
+            "bundled": self.bundled,
+            "surfaces": len(self.surfaces),
+            "masks": len(self.masks),
+            "translucent": sum(self.translucent.values()),
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+        self.listings.clear()
+        self.fonts.clear()
+        self.masks.clear()
+        self.translucent.clear()
+        self.requested.clear()
+        # Bundled surfaces share the mapping, it is unmapped once the last of them is gone
+        self.bundle = None
+        self.bundled = 0
+
+
+class TextCache:
+    def __init__(self, size: int = 256):
+        self.size = size
+        self.surfaces: OrderedDict = OrderedDict()
+
+        self.hits: int = 0
+        self.misses: int = 0
+
+    def render(self, font: pygame.font.Font, text: str, antialias: bool, color) -> pygame.Surface:
+        key = (font, text, color, bool(antialias))
+        surface = self.surfaces.get(key)
+        if surface is not None:
+            self.hits += 1
+            self.surfaces.move_to_end(key)
+            return surface
+
+        self.misses += 1
+        surface = self.surfaces[key] = font.render(text, antialias, color)
+        if len(self.surfaces) > self.size:
+            self.surfaces.popitem(last=False)
+        return surface
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "surfaces": len(self.surfaces),
+        }
+
+    def clear(self):
+        self.surfaces.clear()
+
+
+assets = AssetCache()
+texts = TextCache()
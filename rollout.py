@@ -0,0 +1,151 @@
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+import simulation
+from difficulty import load_schedule
+from settings import TICK_RATE
+from simulation import GameState, NONE, JUMP, DUCK, OBSTACLE_NAMES
+
+# Index 0 means the episode hit max_ticks, the rest name the obstacle that ended it
+CAUSES = ("timeout",) + OBSTACLE_NAMES + ("Helicopter",)
+
+
+def reflex_policy(state: GameState) -> int:
+    dino = state.dino
+    nearest = None
+    for body in state.obstacle_list:
+        if body.x + body.width > dino.x and (nearest is None or body.x < nearest.x):
+            nearest = body
+
+    if nearest is None:
+        return NONE
+    distance = nearest.x - dino.x
+    if nearest.is_helicopter:
+        return DUCK if distance < 40 * state.bg_speed else NONE
+    return JUMP if distance < 12 * state.bg_speed + 40 else NONE
+
+
+def run_episode(seed: int, policy=None, max_ticks: int = 300 * TICK_RATE, record: bool = False,
+                schedule=None) -> tuple:
+    state = GameState(seed, schedule)
+    cause = 0
+    actions = [] if record else None
+    heights = [] if record else None
+
+    while state.dino.alive and state.tick < max_ticks:
+        inputs = policy(state) if policy else NONE
+        simulation.step(state, inputs)
+        if record:
+            actions.append(inputs)
+            heights.append(state.dino.y)
+
+    for event in state.events:
+        if event[0] == "dead":
+            cause = CAUSES.index(event[1].kind)
+
+    trajectory = None
+    if record:
+        trajectory = (np.array(actions, dtype=np.uint8), np.array(heights, dtype=np.float32))
+    return state.score, state.tick, cause, trajectory
+
+
+def run_chunk(seeds: list, policy, max_ticks: int, record: bool, schedule=None) -> dict:
+    started = time.perf_counter()
+    results = [run_episode(seed, policy, max_ticks, record, schedule) for seed in seeds]
+    elapsed = time.perf_counter() - started
+
+    return {
+        "pid": os.getpid(),
+        "seeds": np.array(seeds, dtype=np.int64),
+        "score": np.array([result[0] for result in results], dtype=np.float64),
+        "ticks": np.array([result[1] for result in results], dtype=np.int32),
+        "cause": np.array([result[2] for result in results], dtype=np.int8),
+        "trajectories": [result[3] for result in results] if record else None,
+        "elapsed": elapsed,
+    }
+
+
+class RolloutRunner:
+    """Farms episodes of the simulation core out to a process pool.
+
+    Each task runs a chunk of seeds in its own process with a fresh GameState
+    per episode, and returns compact arrays. ``policy`` must be picklable,
+    i.e. a module-level function taking the GameState and returning inputs.
+    """
+
+    def __init__(self, workers: int = None, policy=None, max_ticks: int = 300 * TICK_RATE,
+                 record: bool = False, chunk_size: int = 64, schedule=None):
+        self.workers = workers or os.cpu_count() or 1
+        self.policy = policy
+        self.max_ticks = max_ticks
+        self.record = record
+        self.chunk_size = chunk_size
+        self.schedule = schedule
+
+    def run(self, episodes: int, seed: int = 0) -> dict:
+        seeds = list(range(seed, seed + episodes))
+        chunks = [seeds[i:i + self.chunk_size] for i in range(0, len(seeds), self.chunk_size)]
+
+        started = time.perf_counter()
+        if self.workers == 1:
+            parts = [run_chunk(chunk, self.policy, self.max_ticks, self.record, self.schedule) for chunk in chunks]
+        else:
+            with ProcessPoolExecutor(max_workers=self.workers) as executor:
+                futures = [executor.submit(run_chunk, chunk, self.policy, self.max_ticks, self.record, self.schedule)
+                           for chunk in chunks]
+                parts = [future.result() for future in futures]
+        elapsed = time.perf_counter() - started
+
+        result = {key: np.concatenate([part[key] for part in parts]) for key in ("seeds", "score", "ticks", "cause")}
+        if self.record:
+            result["trajectories"] = [trajectory for part in parts for trajectory in part["trajectories"]]
+        result["elapsed"] = elapsed
+        result["workers"] = self.worker_stats(parts)
+        return result
+
+    @staticmethod
+    def worker_stats(parts: list) -> dict:
+        stats = {}
+        for part in parts:
+            worker = stats.setdefault(part["pid"], {"episodes": 0, "ticks": 0, "elapsed": 0.0})
+            worker["episodes"] += len(part["seeds"])
+            worker["ticks"] += int(part["ticks"].sum())
+            worker["elapsed"] += part["elapsed"]
+
+        for worker in stats.values():
+            elapsed = worker["elapsed"] or float("inf")
+            worker["episodes_per_sec"] = worker["episodes"] / elapsed
+            worker["ticks_per_sec"] = worker["ticks"] / elapsed
+        return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run headless dino episodes on a process pool")
+    parser.add_argument("--episodes", type=int, default=1000)
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--max-ticks", type=int, default=300 * TICK_RATE)
+    parser.add_argument("--idle", action="store_true", help="never press a key instead of using reflex_policy")
+    parser.add_argument("--difficulty", default="default", help="difficulty curve file (see difficulty.py)")
+    args = parser.parse_args()
+
+    runner = RolloutRunner(args.workers, None if args.idle else reflex_policy, args.max_ticks,
+                           schedule=load_schedule(args.difficulty))
+    result = runner.run(args.episodes, args.seed)
+
+    ticks = int(result["ticks"].sum())
+    print(f"{args.episodes} episodes, {ticks} ticks in {result['elapsed']:.2f}s "
+          f"({args.episodes / result['elapsed']:.0f} episodes/s, {ticks / result['elapsed']:.0f} ticks/s)")
+    print(f"score mean {result['score'].mean():.1f}, max {result['score'].max():.1f}")
+    causes = np.bincount(result["cause"], minlength=len(CAUSES))
+    print("causes:", ", ".join(f"{name}={count}" for name, count in zip(CAUSES, causes) if count))
+    for pid, worker in sorted(result["workers"].items()):
+        print(f"  worker {pid}: {worker['episodes']} episodes, {worker['ticks_per_sec']:.0f} ticks/s")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,40 @@
+WIN_SCALE = 1.4
+
+WIN_SIZE = WIDTH, HEIGHT = int(1000 * WIN_SCALE), int(600 * WIN_SCALE)
+TILE_SIZE = int(50 * WIN_SCALE)
+GROUND_Y = HEIGHT - 2 * TILE_SIZE
+GRAVITY = 0.55
+DEBUG = True
+SCALE = 1.4
+TICK_RATE = 60
+TICK_TIME = 1 / TICK_RATE
+FPS = 60
+MAX_FRAME_TIME = 0.25
+DIRTY_RECTS = False
+ASSET_BUNDLE = "assets.bundle"
+PIXEL_COLLISION = False
+REPLAY_DIR = "replays"
+PROBES = False
+PROBE_DIR = "probes"
+# Dino
+DINO_WIDTH = 100 * SCALE
+DINO_HEIGHT = 0.8 * DINO_WIDTH
+DINO_DOWN_TIMER = 60
+
+COMMANDS = ['alive']
+
+# Obstcle
+CACTUS_WIDTH = 40 * SCALE
+CACTUS_HEIGHT = 1.5 * CACTUS_WIDTH
+
+CRATE_WIDTH = 50 * SCALE
+CRATE_HEIGHT = CRATE_WIDTH
+CRATE_ANGLES = tuple(range(5, 90, 10))
+
+STONE_WIDTH = 40 * SCALE
+STONE_HEIGHT = 1.25 * STONE_WIDTH
+
+# Helicopter
+
+HELICOPTER_WIDTH = 150 * SCALE
+HELICOPTER_HEIGHT = HELICOPTER_WIDTH / 3
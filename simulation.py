@@ -0,0 +1,627 @@
+import math
+import random
+from bisect import bisect_right
+from collections import deque
+from functools import lru_cache
+from operator import attrgetter
+
+from difficulty import Schedule, ramp
+from pool import EntityPool
+from settings import (
+    WIDTH, TILE_SIZE, GROUND_Y, GRAVITY, SCALE, TICK_RATE,
+    DINO_WIDTH, DINO_HEIGHT, DINO_DOWN_TIMER,
+    CACTUS_WIDTH, CACTUS_HEIGHT, CRATE_WIDTH, CRATE_HEIGHT, STONE_WIDTH, STONE_HEIGHT,
+    HELICOPTER_WIDTH, HELICOPTER_HEIGHT,
+)
+
+# Inputs are bit flags so a tick can carry both keys
+NONE = 0
+JUMP = 1
+DUCK = 2
+
+BG_START_SPEED = 4
+BG_MAX_SPEED = 16
+FREEZE_SECONDS = 4
+
+GENERATE_DURATION = 200
+MIN_GENERATE_DURATION = 33
+
+OBSTACLE_START_SPEED = 2
+OBSTACLE_START_ANIM_SPEED = 3
+HELICOPTER_START_SPEED = 2
+OBSTACLE_MAX_SPEED = 3
+OBSTACLE_MIN_ANIM_SPEED = 1
+
+MIN_DOWN_TIMER = 20
+DINO_ANIM_SPEED = 6
+MIN_DINO_ANIM_SPEED = 2
+
+SCORE_PER_TICK = 0.1 * 20
+# Jump force and gravity once the run has started
+JUMP_FORCE = -12 * SCALE - 20
+RUN_GRAVITY = 0.55 * SCALE + 2
+
+SPAWN_CHUNK = 8
+# How far a spawn may be pushed back to leave a way past the obstacles before it
+MAX_SPAWN_DELAY = 2 * TICK_RATE
+
+# Every 100 points the world speeds up and ducks get shorter, every 175 the dino's legs move faster,
+# every 200 obstacles get faster and every 250 they spawn more often
+DEFAULT_SCHEDULE = Schedule(
+    ramp("bg_speed", BG_START_SPEED, 100, 1, BG_MAX_SPEED)
+    + ramp("down_timer", DINO_DOWN_TIMER, 100, -2, MIN_DOWN_TIMER)
+    + ramp("dino_anim_speed", DINO_ANIM_SPEED, 175, -1, MIN_DINO_ANIM_SPEED)
+    + ramp("helicopter_speed", HELICOPTER_START_SPEED, 200, 1, OBSTACLE_MAX_SPEED)
+    + ramp("obstacle_speed", OBSTACLE_START_SPEED, 200, 1, OBSTACLE_MAX_SPEED)
+    + ramp("obstacle_anim_speed", OBSTACLE_START_ANIM_SPEED, 200, -1, OBSTACLE_MIN_ANIM_SPEED)
+    + ramp("generate_duration", GENERATE_DURATION, 250, -20, MIN_GENERATE_DURATION)
+)
+
+OBSTACLE_NAMES = ("Crate", "StoneBlock", "Stone", "Cactus (1)", "Cactus (3)",)
+ROTATING_NAMES = ("Crate", "StoneBlock")
+OBSTACLE_SIZES = {
+    "Crate": (int(CRATE_WIDTH), int(CRATE_HEIGHT)),
+    "StoneBlock": (int(CRATE_WIDTH), int(CRATE_HEIGHT)),
+    "Stone": (int(STONE_WIDTH), int(STONE_HEIGHT)),
+    "Cactus (1)": (int(CACTUS_WIDTH), int(CACTUS_HEIGHT)),
+    "Cactus (3)": (int(CACTUS_WIDTH), int(CACTUS_HEIGHT)),
+    "Helicopter": (int(HELICOPTER_WIDTH), int(HELICOPTER_HEIGHT)),
+}
+
+# Hitboxes, precomputed for the dino size every GameState uses. Against ground obstacles the dino is a
+# trimmed box (x offset, y offset, width, height); a helicopter hits while the dino's x is inside a
+# window starting a third of a dino before it and spanning half its width, and its top is above the
+# helicopter's bottom.
+DINO_HITBOX = (15, 0, int(DINO_WIDTH) // 2, int(DINO_HEIGHT) // 1.5)
+HELICOPTER_REACH = int(DINO_WIDTH) // 3
+HELICOPTER_HEAD = 10
+HELICOPTER_DUCK = 20
+
+# Range of dino.x, relative to the obstacle's x, in which each kind can collide at all
+HIT_SPANS = {
+    kind: (-HELICOPTER_REACH, -HELICOPTER_REACH + width // 2) if kind == "Helicopter"
+    else (-DINO_HITBOX[0] - DINO_HITBOX[2], width - DINO_HITBOX[0])
+    for kind, (width, height) in OBSTACLE_SIZES.items()
+}
+MIN_SPAN = min(span[0] for span in HIT_SPANS.values())
+MAX_SPAN = max(span[1] for span in HIT_SPANS.values())
+# Same for the whole sprites, for a narrow phase that tests drawn pixels. Rotated crates are drawn
+# from the body's top-left and grow by up to sqrt(2)
+MIN_SPRITE_SPAN = -int(DINO_WIDTH)
+MAX_SPRITE_SPAN = max(int(width * 1.5) for width, height in OBSTACLE_SIZES.values())
+
+obstacle_x = attrgetter("x")
+
+
+def jump_profile() -> tuple:
+    # Ticks a jump from the ground lasts, landing included, and for each kind the first and last tick
+    # of it (0 being the tick of the key press) during which the whole tick's motion is above the obstacle
+    height = int(DINO_HEIGHT)
+    ground = GROUND_Y + height // 7 - height
+    heights = []
+    y, vel_y = ground, JUMP_FORCE
+    while True:
+        vel_y += RUN_GRAVITY
+        if y + height + vel_y - height // 7 > GROUND_Y:
+            heights.append(ground)
+            break
+        y += vel_y
+        heights.append(y)
+
+    clear = {}
+    for kind, (width, obstacle_height) in OBSTACLE_SIZES.items():
+        top = GROUND_Y + 5 - obstacle_height
+        ticks = [tick for tick, y in enumerate(heights)
+                 if max(y, heights[tick - 1] if tick else ground) + DINO_HITBOX[1] + DINO_HITBOX[3] <= top]
+        clear[kind] = (ticks[0], ticks[-1])
+    return len(heights), clear
+
+
+JUMP_TICKS, JUMP_CLEAR = jump_profile()
+
+
+def passable(windows: list, duck_end=None) -> bool:
+    """Whether some timing of jumps and ducks gets the dino past every window.
+
+    ``windows`` are ``(enter, exit, kind)``: the first and last play tick an obstacle can touch the
+    dino. A ground obstacle needs a jump whose clear ticks cover its window, a helicopter a duck
+    lasting from before its first tick to after its last. ``duck_end(start)`` is the tick a duck taken
+    on ``start`` stands the dino back up, by default with the down timer it starts with; a duck can
+    only be taken again the tick after. Each jump or duck is placed as early as it can go, which
+    leaves the most room for whatever follows, and reused by the next obstacle when it covers it too.
+    """
+    if duck_end is None:
+        def duck_end(start: int) -> int:
+            return start + DINO_DOWN_TIMER
+
+    ready = -math.inf
+    duck_ready = -math.inf
+    jump = None
+    duck = stand = -math.inf
+    for enter, exit, kind in sorted(windows):
+        if kind == "Helicopter":
+            if duck <= enter and exit < stand:
+                ready = max(ready, exit + 1)
+                continue
+            if duck_end(enter) <= exit:
+                return False
+            # Ducks taken later end later, so search for the first one that lasts past the window
+            low, high = max(ready, duck_ready, 1), enter
+            while low < high:
+                middle = (low + high) // 2
+                if duck_end(middle) > exit:
+                    high = middle
+                else:
+                    low = middle + 1
+            if low > enter:
+                return False
+            duck = low
+            stand = duck_end(duck)
+            ready = exit + 1
+            duck_ready = stand + 1
+            continue
+
+        first, last = JUMP_CLEAR[kind]
+        low, high = exit - last, enter - first
+        if jump is not None and low <= jump <= high:
+            continue
+        jump = max(ready, low)
+        if jump > high:
+            return False
+        ready = duck_ready = jump + JUMP_TICKS
+        duck = stand = -math.inf
+    return True
+
+
+class DinoBody:
+    def __init__(self, x: float, bottom: float, width: float, height: float):
+        self.width = int(width)
+        self.height = int(height)
+        self.x = x - self.width // 2
+        self.y = bottom - self.height
+        self.prev_y = self.y
+
+        self.state = "Idle"
+        self.alive = True
+        self.immortal = False
+
+        self.on_ground = False
+        self.jump_force = -12 * SCALE
+        self.vel_y = 0
+
+        self.down_timer = DINO_DOWN_TIMER
+        self.down_counter = 0
+
+    @property
+    def bottom(self) -> float:
+        return self.y + self.height
+
+
+class ObstacleBody:
+    def __init__(self, kind: str, x: float, bottom: float, speed: int, anim_speed: int, serial: int):
+        self.reset(kind, x, bottom, speed, anim_speed, serial)
+
+    def reset(self, kind: str, x: float, bottom: float, speed: int, anim_speed: int, serial: int):
+        self.kind = kind
+        self.width, self.height = OBSTACLE_SIZES[kind]
+        self.x = x - self.width // 2
+        self.y = bottom - self.height
+        self.prev_x = self.x
+        self.speed = speed
+        self.anim_speed = anim_speed
+        self.serial = serial
+        self.is_active = True
+
+    @property
+    def is_helicopter(self) -> bool:
+        return self.kind == "Helicopter"
+
+    @property
+    def bottom(self) -> float:
+        return self.y + self.height
+
+
+@lru_cache(maxsize=8)
+def spawn_tables(schedule: Schedule) -> dict:
+    # What the spawner needs of a schedule, indexed by play tick up to its last step. A step fires at the
+    # end of the tick the score reaches it, so it holds from the next one
+    tables = {}
+    last = max(math.ceil(threshold / SCORE_PER_TICK) for threshold in schedule.thresholds[:-1] or [0]) + 2
+    for field, start in (
+        ("bg_speed", BG_START_SPEED), ("generate_duration", GENERATE_DURATION),
+        ("obstacle_speed", OBSTACLE_START_SPEED), ("helicopter_speed", HELICOPTER_START_SPEED),
+        ("down_timer", DINO_DOWN_TIMER),
+    ):
+        values = [start] * last
+        for threshold, value in zip(schedule.thresholds, schedule.column(field)):
+            if value is not None:
+                tick = max(math.ceil(threshold / SCORE_PER_TICK), 1) + 1
+                values[tick:] = [value] * (last - tick)
+        tables[field] = values
+
+    # The down timer is read every tick, so a duck ends on the first tick it has lasted longer than it
+    down_timers = tables["down_timer"]
+    ends = []
+    for start in range(last):
+        tick = start
+        while tick - start + 1 <= down_timers[min(tick, last - 1)]:
+            tick += 1
+        ends.append(tick)
+    tables["duck_end"] = ends
+    return tables
+
+
+class SpawnTimeline:
+    """The game's upcoming spawns as ``(tick, kind, x)``: the play tick (counted from the end of the
+    freeze) the obstacle appears on, its kind and the x of its center.
+
+    Spawns are generated ``chunk`` at a time ahead of play, from the game's RNG and the speeds and
+    spawn intervals its difficulty schedule will have reached by then, so the tick loop only compares
+    the play tick with ``next_tick``. Each spawn's layout is checked against the obstacles still on
+    their way before it is queued; one that would leave no way through is pushed back until there is.
+    """
+
+    def __init__(self, rng: random.Random, schedule: Schedule, chunk: int = SPAWN_CHUNK):
+        self.rng = rng
+        self.chunk = chunk
+        self.tables = spawn_tables(schedule)
+        self.dino_x = 200 * SCALE - int(DINO_WIDTH) // 2
+
+        self.queue: deque = deque()
+        self.windows: list = []
+        # A spawn comes once more ticks than the spawn interval have passed since the previous one,
+        # and the first counts from the first play tick
+        self.last_tick = 1
+        self.next_tick = None
+
+        self.generated = 0
+        self.delayed = 0
+        self.unfair = 0
+
+    def value(self, field: str, tick: int):
+        values = self.tables[field]
+        return values[tick] if tick < len(values) else values[-1]
+
+    def duck_end(self, start: int) -> int:
+        ends = self.tables["duck_end"]
+        if start < len(ends):
+            return ends[start]
+        return start + self.tables["down_timer"][-1]
+
+    def window(self, tick: int, kind: str, x: int) -> tuple:
+        # The ticks during which the obstacle's x span passes the dino
+        width = OBSTACLE_SIZES[kind][0]
+        low, high = HIT_SPANS[kind]
+        if kind == "Helicopter":
+            own = self.value("helicopter_speed", tick)
+        else:
+            own = self.value("obstacle_speed", tick) if kind in ROTATING_NAMES else 0
+
+        speeds = self.tables["bg_speed"]
+        end = len(speeds) - 1
+        # Moved like update_obstacle moves the body, so the ticks match the game's exactly
+        left = x - width // 2
+        enter = None
+        while True:
+            prev = left
+            left -= speeds[min(tick, end)] + own
+            if enter is None and self.dino_x - left > low:
+                enter = tick
+            if self.dino_x - prev >= high:
+                return enter, tick - 1, kind
+            tick += 1
+
+    def fill(self):
+        for _ in range(self.chunk):
+            tick = self.last_tick + 1
+            while tick - self.last_tick <= self.value("generate_duration", tick):
+                tick += 1
+
+            if self.rng.randint(1, 10) < 8:
+                x = self.rng.randint(WIDTH, WIDTH + 100)
+                kind = self.rng.choice(OBSTACLE_NAMES)
+            else:
+                x = self.rng.randint(WIDTH + 10, WIDTH + 20)
+                kind = "Helicopter"
+
+            self.windows = [window for window in self.windows if window[1] >= tick]
+            for delay in range(MAX_SPAWN_DELAY + 1):
+                window = self.window(tick + delay, kind, x)
+                if passable(self.windows + [window], self.duck_end):
+                    self.windows.append(window)
+                    break
+            else:
+                # Not even alone at these speeds; left out of later checks, which it would fail all
+                delay = 0
+                self.unfair += 1
+            self.delayed += delay > 0
+
+            self.queue.append((tick + delay, kind, x))
+            self.last_tick = tick + delay
+            self.generated += 1
+
+        self.next_tick = self.queue[0][0]
+
+    def pop(self) -> tuple:
+        spawn = self.queue.popleft()
+        if not self.queue:
+            self.fill()
+        self.next_tick = self.queue[0][0]
+        return spawn
+
+    def stats(self) -> dict:
+        return {
+            "generated": self.generated,
+            "queued": len(self.queue),
+            "delayed": self.delayed,
+            "unfair": self.unfair,
+        }
+
+
+class GameState:
+    def __init__(self, seed: int = None, schedule: Schedule = None):
+        # An unseeded game still gets a seed of its own so it can be replayed
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+
+        self.tick = 0
+        self.score = 0
+        self.timer = 0
+        self.timer_counter = 0
+
+        self.is_freeze = True
+        self.freeze_left = FREEZE_SECONDS * TICK_RATE
+
+        self.bg_speed = 0
+        self.gravity = GRAVITY * SCALE
+
+        self.play_tick = 0
+
+        self.obstacle_speed = OBSTACLE_START_SPEED
+        self.obstacle_anim_speed = OBSTACLE_START_ANIM_SPEED
+        self.helicopter_speed = HELICOPTER_START_SPEED
+        # The fastest any obstacle of the game can be moving, curves may lower speeds later
+        self.top_speed = max(OBSTACLE_START_SPEED, HELICOPTER_START_SPEED)
+        self.dino_anim_speed = DINO_ANIM_SPEED
+
+        self.schedule = schedule if schedule is not None else DEFAULT_SCHEDULE
+        self.next_step = 0
+        self.spawns = SpawnTimeline(self.rng, self.schedule)
+
+        self.dino = DinoBody(200 * SCALE, GROUND_Y - TILE_SIZE, DINO_WIDTH, DINO_HEIGHT)
+        self.obstacles = EntityPool()
+        self.serial = 0
+
+        # Filled by step() for the renderer: ("spawn", body), ("dead", body), ("anim_speedup",)
+        self.events: list = []
+        # Optional narrow phase replacing the hitboxes, overlap(dino, body) -> bool
+        self.overlap = None
+
+    @property
+    def obstacle_list(self) -> list:
+        return self.obstacles.live
+
+
+def apply_inputs(state: GameState, inputs: int):
+    dino = state.dino
+    if inputs & JUMP and dino.alive and dino.on_ground and dino.state != "Idle":
+        dino.state = "Jump"
+        dino.vel_y = dino.jump_force
+        dino.on_ground = False
+
+    if inputs & DUCK and dino.alive and dino.state not in ("Idle", "Down", "Jump"):
+        dino.state = "Down"
+        dino.down_counter = 0
+
+
+def update_freeze(state: GameState):
+    state.freeze_left -= 1
+    if state.freeze_left <= 0:
+        state.is_freeze = False
+        state.bg_speed = BG_START_SPEED
+        if state.dino.alive:
+            state.dino.state = "Run"
+
+
+def generate_obstacle(state: GameState):
+    spawns = state.spawns
+    if spawns.next_tick is None:
+        spawns.fill()
+    if spawns.next_tick != state.play_tick:
+        return
+
+    tick, kind, x = spawns.pop()
+    state.serial += 1
+    if kind == "Helicopter":
+        body = state.obstacles.spawn(ObstacleBody, kind, x, GROUND_Y - state.dino.height // 1.5,
+                                     state.helicopter_speed, 2, state.serial)
+    else:
+        body = state.obstacles.spawn(ObstacleBody, kind, x, GROUND_Y + 5,
+                                     state.obstacle_speed, state.obstacle_anim_speed, state.serial)
+    state.events.append(("spawn", body))
+
+
+def update_obstacle(state: GameState, body: ObstacleBody):
+    body.prev_x = body.x
+    if body.is_helicopter:
+        if body.x > -body.width:
+            body.x -= state.bg_speed + body.speed
+        else:
+            body.is_active = False
+        return
+
+    body.x -= state.bg_speed
+    if body.x + 4 * body.width < 0:
+        body.is_active = False
+
+    if body.kind in ROTATING_NAMES:
+        body.x -= body.speed
+
+
+def update_dino(state: GameState):
+    dino = state.dino
+    dino.prev_y = dino.y
+    dy = 0
+    if not dino.on_ground:
+        dino.vel_y += state.gravity
+        dy += dino.vel_y
+
+    if dino.bottom + dy - dino.height // 7 > GROUND_Y:
+        dy = GROUND_Y - dino.bottom + dino.height // 7
+        dino.on_ground = True
+        if dino.alive and not state.is_freeze:
+            dino.state = "Run"
+
+    dino.y += dy
+
+    if dino.alive and dino.state == "Down":
+        dino.down_counter += 1
+        if dino.down_counter > dino.down_timer:
+            dino.down_counter = 0
+            dino.state = "Run"
+
+
+def collides(dino: DinoBody, body: ObstacleBody) -> bool:
+    low, high = HIT_SPANS[body.kind]
+    if not body.x + low < dino.x < body.x + high:
+        return False
+
+    if body.is_helicopter:
+        duck = HELICOPTER_DUCK if dino.state == "Down" else 0
+        return dino.y + HELICOPTER_HEAD + duck < body.bottom
+
+    y = dino.y + DINO_HITBOX[1]
+    return y < body.y + body.height and body.y < y + DINO_HITBOX[3]
+
+
+def sweep(start: float, end: float, low: float, high: float) -> tuple:
+    # Times in [0, 1] while a value moving linearly from start to end is strictly between low and high
+    if start == end:
+        return (0.0, 1.0) if low < start < high else (1.0, 0.0)
+
+    t0 = (low - start) / (end - start)
+    t1 = (high - start) / (end - start)
+    if t0 > t1:
+        t0, t1 = t1, t0
+    return max(t0, 0.0), min(t1, 1.0)
+
+
+def collides_swept(dino: DinoBody, body: ObstacleBody) -> bool:
+    """Whether the hitboxes touch at any point of the tick's motion, not only where it ends.
+
+    Obstacles only move along x and the dino only along y, so both ranges
+    are linear in time and the boxes touch when the two time windows overlap.
+    Anything ``collides`` reports at the end of the tick is a hit here too.
+    """
+    low, high = HIT_SPANS[body.kind]
+    x0, x1 = sweep(dino.x - body.prev_x, dino.x - body.x, low, high)
+    if x0 >= x1:
+        return False
+
+    if body.is_helicopter:
+        duck = HELICOPTER_DUCK if dino.state == "Down" else 0
+        low, high = float("-inf"), body.bottom - HELICOPTER_HEAD - duck
+    else:
+        low, high = body.y - DINO_HITBOX[1] - DINO_HITBOX[3], body.y + body.height - DINO_HITBOX[1]
+    y0, y1 = sweep(dino.prev_y, dino.y, low, high)
+    return max(x0, y0) < min(x1, y1)
+
+
+def candidates(state: GameState, low: float = MIN_SPAN, high: float = MAX_SPAN, reach: float = 0) -> list:
+    # Broad phase over the x-sorted live list: only bodies whose span can contain dino.x. reach widens
+    # the window to the left by how far an obstacle can have moved past the dino this tick
+    live = state.obstacles.live
+    x = state.dino.x
+    start = bisect_right(live, x - high - reach, key=obstacle_x)
+    end = bisect_right(live, x - low, lo=start, key=obstacle_x)
+    return live[start:end]
+
+
+def collide_obstacles(state: GameState):
+    dino = state.dino
+    if not dino.alive or dino.immortal:
+        return
+
+    if state.overlap is None:
+        # Body speeds are copied from the state at spawn, so none is above the top speed
+        reach = state.bg_speed + state.top_speed
+        bodies, test = candidates(state, reach=reach), collides_swept
+    else:
+        bodies, test = candidates(state, MIN_SPRITE_SPAN, MAX_SPRITE_SPAN), state.overlap
+
+    for body in bodies:
+        if test(dino, body):
+            dino.alive = False
+            dino.state = "Dead"
+            state.bg_speed = 0
+            body.speed = 0
+            state.events.append(("dead", body))
+            return
+
+
+def update_score(state: GameState):
+    state.score += SCORE_PER_TICK
+
+    state.dino.jump_force = JUMP_FORCE
+    state.gravity = RUN_GRAVITY
+
+    schedule = state.schedule
+    while state.score >= schedule.thresholds[state.next_step]:
+        apply_step(state, schedule.changes[state.next_step])
+        state.next_step += 1
+
+
+def apply_step(state: GameState, changes: tuple):
+    for field, value in changes:
+        if field == "generate_duration":
+            # Already in the spawn timeline's tables
+            continue
+        if field == "down_timer":
+            state.dino.down_timer = value
+        else:
+            setattr(state, field, value)
+        if field in ("obstacle_speed", "helicopter_speed"):
+            state.top_speed = max(state.top_speed, value)
+        if field == "dino_anim_speed":
+            state.events.append(("anim_speedup",))
+
+
+def step(state: GameState, inputs: int = NONE) -> GameState:
+    state.events.clear()
+    state.tick += 1
+
+    apply_inputs(state, inputs)
+
+    if state.is_freeze:
+        update_freeze(state)
+
+    if state.dino.alive and not state.is_freeze:
+        state.play_tick += 1
+        generate_obstacle(state)
+        state.timer_counter += 1
+
+        if state.timer_counter >= TICK_RATE:
+            state.timer_counter = 0
+            state.timer += 1
+
+    if state.dino.alive:
+        for body in state.obstacles.live:
+            update_obstacle(state, body)
+        # Crates outrun the rest, so the order can change; nearly sorted input keeps this linear
+        state.obstacles.live.sort(key=obstacle_x)
+
+    update_dino(state)
+    collide_obstacles(state)
+
+    if not state.is_freeze and state.dino.alive:
+        update_score(state)
+
+    state.obstacles.prune()
+    return state
+
+
+def simulate(policy=None, seed: int = None, max_ticks: int = 60 * TICK_RATE) -> GameState:
+    state = GameState(seed)
+    while state.dino.alive and state.tick < max_ticks:
+        step(state, policy(state) if policy else NONE)
+    return state
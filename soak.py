@@ -0,0 +1,206 @@
+import argparse
+import json
+import os
+import resource
+import tempfile
+import time
+import tracemalloc
+
+from settings import TICK_TIME, HEIGHT, FPS
+
+MB = 2 ** 20
+
+
+def rss_mb() -> float:
+    try:
+        with open("/proc/self/statm") as file:
+            return int(file.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / MB
+    except OSError:
+        # Peak rather than current RSS, still shows growth
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def slope(points: list) -> float:
+    # Least-squares slope of (x, y) points
+    if len(points) < 2:
+        return 0.0
+    n = len(points)
+    mean_x = sum(x for x, y in points) / n
+    mean_y = sum(y for x, y in points) / n
+    spread = sum((x - mean_x) ** 2 for x, y in points)
+    if not spread:
+        return 0.0
+    return sum((x - mean_x) * (y - mean_y) for x, y in points) / spread
+
+
+class Soak:
+    """Plays scripted games with restarts through the real fail and start screens for a long time.
+
+    Each run plays the reflex policy until the dino dies, lets the fail
+    screen slide in and then restarts, every ``home_every``-th run by way of
+    the start screen. Memory is sampled every ``interval`` seconds.
+    """
+
+    def __init__(self, game, interval: float, trace: bool, home_every: int = 5, max_run_ticks: int = 60 * 60):
+        self.game = game
+        self.interval = interval
+        self.trace = trace
+        self.home_every = home_every
+        self.max_run_ticks = max_run_ticks
+
+        self.runs = 0
+        self.frames = 0
+        self.samples: list = []
+        self.resets: list = []
+        self.baseline = None
+        self.snapshot = None
+
+    def play_run(self):
+        from rollout import reflex_policy
+
+        scene = self.game.scene
+        while scene.dino.alive and scene.state.tick < self.max_run_ticks:
+            scene.inputs = reflex_policy(scene.state)
+            self.frame(scene)
+
+        if scene.dino.alive:
+            scene.state.dino.alive = False
+            scene.state.dino.state = "Dead"
+        while scene.fail_screen.rect.bottom < HEIGHT:
+            self.frame(scene)
+
+        self.runs += 1
+        if self.runs % self.home_every:
+            scene.fail_screen.restart()
+        else:
+            scene.fail_screen.home()
+            start_screen = self.game.start_screen
+            for _ in range(120):
+                start_screen.frame()
+                self.frames += 1
+            self.game.is_active_start = True
+        self.resets.append(scene.reset_ms)
+        self.game.remove_dirs()
+
+    def frame(self, scene):
+        scene.frame(TICK_TIME)
+        self.frames += 1
+
+    def sample(self, elapsed: float):
+        sample = {"elapsed_s": elapsed, "runs": self.runs, "frames": self.frames, "rss_mb": rss_mb()}
+        if self.trace:
+            sample["traced_mb"] = tracemalloc.get_traced_memory()[0] / MB
+            snapshot = tracemalloc.take_snapshot()
+            if self.baseline is None:
+                self.baseline = snapshot
+            sample["top"] = [
+                {"where": str(stat.traceback[0]), "size_kb": stat.size / 1024, "count": stat.count}
+                for stat in snapshot.statistics("lineno")[:10]
+            ]
+            self.snapshot = snapshot
+        self.samples.append(sample)
+        print(f"{elapsed / 60:7.1f} min  {self.runs:6d} runs  rss {sample['rss_mb']:7.1f} MB"
+              + (f"  traced {sample['traced_mb']:7.2f} MB" if self.trace else ""), flush=True)
+
+    def run(self, duration: float):
+        if self.trace:
+            tracemalloc.start()
+
+        started = time.perf_counter()
+        next_sample = 0.0
+        while True:
+            elapsed = time.perf_counter() - started
+            if elapsed >= next_sample:
+                self.sample(elapsed)
+                next_sample += self.interval
+            if elapsed >= duration:
+                break
+            self.play_run()
+
+        if self.trace:
+            tracemalloc.stop()
+
+    def report(self, warmup: float, threshold: float) -> dict:
+        # Caches fill during the first runs, so the trend only counts samples after the warm-up
+        settled = [sample for sample in self.samples if sample["elapsed_s"] >= warmup] or self.samples
+        hours = [(sample["elapsed_s"] / 3600, sample["rss_mb"]) for sample in settled]
+        report = {
+            "runs": self.runs,
+            "frames": self.frames,
+            "duration_s": self.samples[-1]["elapsed_s"],
+            "rss_start_mb": settled[0]["rss_mb"],
+            "rss_end_mb": settled[-1]["rss_mb"],
+            "rss_peak_mb": max(sample["rss_mb"] for sample in self.samples),
+            "rss_mb_per_hour": slope(hours),
+            "threshold_mb_per_hour": threshold,
+        }
+        report["growing"] = report["rss_mb_per_hour"] > threshold
+        if self.resets:
+            resets = sorted(self.resets)
+            report["restart_p50_ms"] = resets[len(resets) // 2]
+            report["restart_max_ms"] = resets[-1]
+            report["restarts_over_frame"] = sum(reset > 1000 / FPS for reset in resets)
+
+        if self.trace:
+            traced = [(sample["elapsed_s"] / 3600, sample["traced_mb"]) for sample in settled]
+            report["traced_mb_per_hour"] = slope(traced)
+            report["growing"] |= report["traced_mb_per_hour"] > threshold
+            report["top_growth"] = [
+                {"where": str(stat.traceback[0]), "size_diff_kb": stat.size_diff / 1024, "count_diff": stat.count_diff}
+                for stat in self.snapshot.compare_to(self.baseline, "lineno")[:15]
+            ]
+
+        report["samples"] = self.samples
+        return report
+
+
+def print_report(report: dict):
+    print(f"\n{report['runs']} runs, {report['frames']} frames in {report['duration_s'] / 60:.1f} min")
+    print(f"rss {report['rss_start_mb']:.1f} -> {report['rss_end_mb']:.1f} MB "
+          f"(peak {report['rss_peak_mb']:.1f}), trend {report['rss_mb_per_hour']:+.2f} MB/h")
+    if "restart_max_ms" in report:
+        print(f"restart p50 {report['restart_p50_ms']:.2f} ms, max {report['restart_max_ms']:.2f} ms, "
+              f"{report['restarts_over_frame']} over one frame")
+    if "traced_mb_per_hour" in report:
+        print(f"python heap trend {report['traced_mb_per_hour']:+.2f} MB/h, largest growth since the first sample:")
+        for stat in report["top_growth"]:
+            print(f"  {stat['size_diff_kb']:+10.1f} KB {stat['count_diff']:+7d} blocks  {stat['where']}")
+    verdict = "GROWING" if report["growing"] else "bounded"
+    print(f"memory {verdict} (threshold {report['threshold_mb_per_hour']} MB/h)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play and restart the game headlessly for hours, tracking memory")
+    parser.add_argument("--minutes", type=float, default=240)
+    parser.add_argument("--interval", type=float, default=60, help="seconds between memory samples")
+    parser.add_argument("--warmup", type=float, default=300, help="seconds left out of the trend")
+    parser.add_argument("--threshold", type=float, default=1.0, help="MB per hour counted as growth")
+    parser.add_argument("--no-tracemalloc", action="store_true", help="only sample RSS, runs about twice as fast")
+    parser.add_argument("--report", default="soak_report.json")
+    args = parser.parse_args()
+
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import pygame
+    import app
+    from capture import screenshots
+
+    # Every restart saves a screenshot and a replay log, keep them out of the checkout
+    screenshots.directory = tempfile.mkdtemp(prefix="dino-soak-")
+    app.REPLAY_DIR = tempfile.mkdtemp(prefix="dino-soak-replays-")
+    game = app.Game(seed=0)
+    game.is_active_start = True
+
+    soak = Soak(game, args.interval, not args.no_tracemalloc)
+    soak.run(args.minutes * 60)
+    report = soak.report(args.warmup, args.threshold)
+    print_report(report)
+    pygame.quit()
+
+    with open(args.report, "w") as file:
+        json.dump(report, file, indent=2)
+    raise SystemExit(1 if report["growing"] else 0)
+
+
+if __name__ == '__main__':
+    main()
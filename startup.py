@@ -0,0 +1,90 @@
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+import time
+
+PHASES = ("import", "display", "fonts", "assets", "first_frame")
+
+
+def measure() -> dict:
+    """Times one cold start in this process, up to the first presented frame."""
+    timings = {}
+    last = time.perf_counter()
+
+    def mark(phase: str):
+        nonlocal last
+        now = time.perf_counter()
+        timings[phase] = (now - last) * 1000
+        last = now
+
+    import pygame
+    import app
+    from settings import WIN_SIZE
+    mark("import")
+
+    pygame.init()
+    pygame.display.set_mode(WIN_SIZE)
+    mark("display")
+
+    pygame.sysfont.get_fonts()
+    mark("fonts")
+
+    game = app.Game()
+    mark("assets")
+
+    game.scene.draw_world()
+    pygame.display.update()
+    mark("first_frame")
+
+    timings["total"] = sum(timings[phase] for phase in PHASES)
+    timings["max_rss_mb"] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    timings["cv2_loaded"] = "cv2" in sys.modules
+    pygame.quit()
+    return timings
+
+
+def percentile(values: list, fraction: float) -> float:
+    values = sorted(values)
+    return values[min(int(fraction * len(values)), len(values) - 1)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure time to first frame, split by startup phase")
+    parser.add_argument("--runs", type=int, default=5, help="cold starts, each in a fresh interpreter")
+    parser.add_argument("--headless", action="store_true", help="use SDL's dummy video driver")
+    parser.add_argument("--json", help="also write every run to this file")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.headless:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    if args.child:
+        print(json.dumps(measure()))
+        return
+
+    env = dict(os.environ, PYGAME_HIDE_SUPPORT_PROMPT="1")
+    command = [sys.executable, os.path.abspath(__file__), "--child"] + (["--headless"] if args.headless else [])
+    runs = []
+    for _ in range(args.runs):
+        output = subprocess.run(command, env=env, capture_output=True, text=True, check=True,
+                                cwd=os.path.dirname(os.path.abspath(__file__))).stdout
+        runs.append(json.loads(output.strip().splitlines()[-1]))
+
+    print(f"{'phase':<12} {'median':>9} {'max':>9}")
+    for phase in PHASES + ("total",):
+        values = [run[phase] for run in runs]
+        print(f"{phase:<12} {percentile(values, 0.5):>7.1f}ms {max(values):>7.1f}ms")
+    print(f"max rss {max(run['max_rss_mb'] for run in runs):.1f} MB, "
+          f"cv2 loaded: {any(run['cv2_loaded'] for run in runs)}")
+
+    if args.json:
+        with open(args.json, "w") as file:
+            json.dump(runs, file, indent=2)
+
+
+if __name__ == '__main__':
+    main()